@@ -0,0 +1,146 @@
+"""Throughput benchmark for RetreaverClient against a local stand-in API.
+
+Starts a small threaded HTTP/1.1 server that serves paginated, gzip-capable
+``/targets.json`` pages with Link headers, then scrapes every page through
+``RetreaverClient`` under a few transport configurations.
+
+Usage:
+    python benchmarks/client_throughput.py [--pages 200] [--per-page 100] [--concurrency 16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def _make_handler(pages: int, per_page: int, latency: float) -> type[BaseHTTPRequestHandler]:
+    bodies = []
+    for page in range(1, pages + 1):
+        items = [
+            {"target": {
+                "id": i, "name": f"Target {i}", "number": f"+1555{i:07d}", "tid": None,
+                "priority": 1, "weight": 1, "timeout_seconds": 30, "concurrency_cap": None,
+                "paused": False, "time_zone": "Eastern Time (US & Canada)",
+                "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+            }}
+            for i in range((page - 1) * per_page, page * per_page)
+        ]
+        raw = json.dumps(items).encode()
+        bodies.append((raw, gzip.compress(raw)))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            raw, compressed = bodies[min(page, pages) - 1]
+            use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = compressed if use_gzip else raw
+            links = [f'<http://stand-in/targets.json?page={pages}>; rel="last"']
+            if page < pages:
+                links.append(f'<http://stand-in/targets.json?page={page + 1}>; rel="next"')
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Link", ", ".join(links))
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+async def _scrape(pages: int, concurrency: int) -> tuple[float, int]:
+    from retreaver_mcp_servers.client import RetreaverClient
+
+    client = RetreaverClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    received = 0
+
+    async def fetch(page: int) -> None:
+        nonlocal received
+        async with semaphore:
+            result = await client.get("/targets.json", {"page": page})
+        received += len(result["data"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(page) for page in range(1, pages + 1)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed, received
+
+
+def _run_case(label: str, env: dict[str, str], pages: int, concurrency: int) -> None:
+    import importlib
+
+    from retreaver_mcp_servers import client as client_module
+
+    os.environ.update(env)
+    importlib.reload(client_module)
+    elapsed, received = asyncio.run(_scrape(pages, concurrency))
+    print(f"{label:<32} {pages / elapsed:8.1f} pages/s  {received / elapsed:10.0f} records/s  ({elapsed:.2f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated server latency per request (s)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(args.pages, args.per_page, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        "RETREAVER_API_KEY": "bench",
+        "RETREAVER_COMPANY_ID": "1",
+        "RETREAVER_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        # Keep the adaptive limiter out of the way; this measures the transport.
+        "RETREAVER_RATE_LIMIT": "100000",
+        "RETREAVER_RATE_LIMIT_MAX": "100000",
+        "RETREAVER_RATE_BURST": "100000",
+    })
+
+    print(f"{args.pages} pages x {args.per_page} records, concurrency {args.concurrency}\n")
+    cases = [
+        ("1 connection, no compression", {
+            "RETREAVER_HTTP_MAX_CONNECTIONS": "1", "RETREAVER_HTTP_COMPRESSION": "identity",
+        }),
+        ("1 connection, gzip", {
+            "RETREAVER_HTTP_MAX_CONNECTIONS": "1", "RETREAVER_HTTP_COMPRESSION": "auto",
+        }),
+        ("pooled, no compression", {
+            "RETREAVER_HTTP_MAX_CONNECTIONS": str(args.concurrency), "RETREAVER_HTTP_COMPRESSION": "identity",
+        }),
+        ("pooled, gzip", {
+            "RETREAVER_HTTP_MAX_CONNECTIONS": str(args.concurrency), "RETREAVER_HTTP_COMPRESSION": "auto",
+        }),
+    ]
+    for label, env in cases:
+        env["RETREAVER_HTTP_MAX_KEEPALIVE"] = env["RETREAVER_HTTP_MAX_CONNECTIONS"]
+        _run_case(label, env, args.pages, args.concurrency)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
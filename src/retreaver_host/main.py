@@ -60,6 +60,7 @@ async def _run() -> None:
     async with ClientSessionGroup() as mcp_server_group:
         log.info("Connecting to read server at %s ...", read_url)
         await mcp_server_group.connect_to_server(SseServerParameters(url=read_url))
+        read_only_tools = frozenset(mcp_server_group.tools)
 
         log.info("Connecting to write server at %s ...", write_url)
         await mcp_server_group.connect_to_server(SseServerParameters(url=write_url))
@@ -67,7 +68,7 @@ async def _run() -> None:
         tool_names = list(mcp_server_group.tools.keys())
         log.info("Connected — %d tools available: %s", len(tool_names), ", ".join(tool_names))
 
-        ws_server = await start_ws_server(llm, mcp_server_group, ws_host, ws_port)
+        ws_server = await start_ws_server(llm, mcp_server_group, ws_host, ws_port, read_only_tools)
 
         #stops at the await stop.wait() line, until kill signals are sent. python event loop is listening, sets stop=True
         stop = asyncio.Event()
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -20,6 +22,20 @@ from mcp import types as mcp_types
 Message = dict[str, Any]
 
 
+class MessageHistory(list):
+    """Append-only message list that also carries providers' converted copies of it.
+
+    ``converted`` maps a provider's conversion function to
+    ``(messages converted, last message converted, converted list)``, so each
+    round converts only the messages appended since the previous one (see
+    ``LLMProvider._convert_history``).
+    """
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.converted: dict[Callable, tuple[int, Message | None, list]] = {}
+
+
 @dataclass
 class ToolCall:
     id: str
@@ -27,10 +43,49 @@ class ToolCall:
     arguments: dict[str, Any]
 
 
+@dataclass
+class Usage:
+    """Token counts for one LLM call.
+
+    ``input_tokens`` counts the whole prompt, including the
+    ``cache_read_tokens`` served from the provider's prompt cache and the
+    ``cache_write_tokens`` newly written to it.
+    """
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def __add__(self, other: Usage) -> Usage:
+        return Usage(
+            self.input_tokens + other.input_tokens,
+            self.output_tokens + other.output_tokens,
+            self.cache_read_tokens + other.cache_read_tokens,
+            self.cache_write_tokens + other.cache_write_tokens,
+        )
+
+
 @dataclass
 class LLMResponse:
     text: str | None = None
     tool_calls: list[ToolCall] = field(default_factory=list)
+    usage: Usage | None = None
+
+
+@dataclass
+class StreamEvent:
+    """One event from ``LLMProvider.stream``.
+
+    ``type`` is ``"text"`` (``text`` holds the next text delta),
+    ``"tool_call"`` (``tool_call`` holds a complete tool call) or ``"done"``
+    (``response`` holds the assembled LLMResponse; always the last event).
+    """
+
+    type: str
+    text: str | None = None
+    tool_call: ToolCall | None = None
+    response: LLMResponse | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -39,6 +94,40 @@ class LLMResponse:
 
 
 class LLMProvider(ABC):
+    # (tools, converted payload) from the last _tool_payload call.
+    _tool_cache: tuple[list[mcp_types.Tool], Any] | None = None
+
+    def _tool_payload(self, tools: list[mcp_types.Tool], convert: Callable[[list[mcp_types.Tool]], Any]) -> Any:
+        """``convert(tools)``, reused for as long as the same Tool objects are passed.
+
+        The MCP group hands out the same Tool instances until it reconnects,
+        so the identity of the list's elements is the tool-set version.
+        """
+        cached = self._tool_cache
+        if cached is not None and len(cached[0]) == len(tools) and all(a is b for a, b in zip(cached[0], tools)):
+            return cached[1]
+        payload = convert(tools)
+        self._tool_cache = (list(tools), payload)
+        return payload
+
+    @staticmethod
+    def _convert_history(messages: list[Message], convert: Callable[[list[Message]], list]) -> list:
+        """``convert(messages)``, converting only new messages when ``messages`` is a MessageHistory.
+
+        ``convert`` must translate each message independently of the others.
+        The returned list is shared with the cache and must not be modified.
+        """
+        cache = getattr(messages, "converted", None)
+        if cache is None:
+            return convert(messages)
+        count, last, out = cache.get(convert, (0, None, []))
+        if count > len(messages) or (count and messages[count - 1] is not last):
+            count, out = 0, []  # history was rewritten, not appended to
+        if count < len(messages):
+            out.extend(convert(messages[count:]))
+            cache[convert] = (len(messages), messages[-1], out)
+        return out
+
     @abstractmethod
     async def complete(
         self,
@@ -48,6 +137,24 @@ class LLMProvider(ABC):
     ) -> LLMResponse:
         """Send a chat completion request and return an LLMResponse."""
 
+    async def stream(
+        self,
+        messages: list[Message],
+        tools: list[mcp_types.Tool],
+        system_prompt: str,
+    ) -> AsyncIterator[StreamEvent]:
+        """Stream a chat completion as text deltas, then tool calls, then a final ``done`` event.
+
+        The default implementation waits for ``complete`` and replays its
+        result; providers override it to stream tokens as they arrive.
+        """
+        response = await self.complete(messages, tools, system_prompt)
+        if response.text:
+            yield StreamEvent("text", text=response.text)
+        for tc in response.tool_calls:
+            yield StreamEvent("tool_call", tool_call=tc)
+        yield StreamEvent("done", response=response)
+
 
 # ---------------------------------------------------------------------------
 # Anthropic implementation
@@ -84,8 +191,52 @@ def _messages_to_anthropic(messages: list[Message]) -> list[dict[str, Any]]:
     return out
 
 
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _with_cache_breakpoint(blocks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Copy of ``blocks`` with a prompt-cache breakpoint on the last one."""
+    if not blocks:
+        return blocks
+    return [*blocks[:-1], {**blocks[-1], "cache_control": _CACHE_CONTROL}]
+
+
+def _anthropic_tools(tools: list[mcp_types.Tool]) -> list[dict[str, Any]]:
+    """Anthropic tool list with a prompt-cache breakpoint after the last tool."""
+    return _with_cache_breakpoint([_mcp_tool_to_anthropic(t) for t in tools])
+
+
+def _cache_conversation(api_messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Put a cache breakpoint at the end of the conversation so the next round reuses it as a prefix."""
+    if not api_messages:
+        return api_messages
+    last = api_messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}] if content else []
+    return [*api_messages[:-1], {**last, "content": _with_cache_breakpoint(content)}]
+
+
+def _anthropic_usage(usage: Any) -> Usage | None:
+    if usage is None:
+        return None
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    return Usage(
+        input_tokens=(usage.input_tokens or 0) + cache_read + cache_write,
+        output_tokens=usage.output_tokens or 0,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
+    )
+
+
 class AnthropicProvider(LLMProvider):
-    """LLM provider backed by Anthropic's Messages API."""
+    """LLM provider backed by Anthropic's Messages API.
+
+    Requests carry prompt-cache breakpoints on the tools, the system prompt
+    and the end of the conversation, so each round of a tool loop re-reads
+    the previous round's prompt from the cache instead of reprocessing it.
+    """
 
     def __init__(self, model: str = "claude-sonnet-4-20250514", api_key: str | None = None) -> None:
         # Lazy import so the package is only needed when this provider is used.
@@ -100,7 +251,7 @@ class AnthropicProvider(LLMProvider):
         tools: list[mcp_types.Tool],
         system_prompt: str,
     ) -> LLMResponse:
-        api_tools = [_mcp_tool_to_anthropic(t) for t in tools]
+        api_tools = self._tool_payload(tools, _anthropic_tools)
         api_messages = _messages_to_anthropic(messages)
 
         log.debug(
@@ -111,39 +262,78 @@ class AnthropicProvider(LLMProvider):
             ),
         )
 
-        response = await self._client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            system=system_prompt,
-            messages=api_messages,
-            tools=api_tools if api_tools else [],
-        )
+        response = await self._client.messages.create(**self._request(api_messages, api_tools, system_prompt))
 
         log.debug(
             "Anthropic API response:\n%s",
             json.dumps(response.model_dump(), indent=2, default=str),
         )
 
-        text_parts: list[str] = []
-        tool_calls: list[ToolCall] = []
+        return _anthropic_response(response)
 
-        for block in response.content:
-            if block.type == "text":
-                text_parts.append(block.text)
-            elif block.type == "tool_use":
-                tool_calls.append(
-                    ToolCall(
-                        id=block.id,
-                        name=block.name,
-                        arguments=block.input if isinstance(block.input, dict) else json.loads(block.input),
-                    )
-                )
+    def _request(
+        self,
+        api_messages: list[dict[str, Any]],
+        api_tools: list[dict[str, Any]],
+        system_prompt: str,
+    ) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "system": [{"type": "text", "text": system_prompt, "cache_control": _CACHE_CONTROL}],
+            "messages": _cache_conversation(api_messages),
+            "tools": api_tools,
+        }
 
-        return LLMResponse(
-            text="\n".join(text_parts) if text_parts else None,
-            tool_calls=tool_calls,
+    async def stream(
+        self,
+        messages: list[Message],
+        tools: list[mcp_types.Tool],
+        system_prompt: str,
+    ) -> AsyncIterator[StreamEvent]:
+        api_tools = self._tool_payload(tools, _anthropic_tools)
+        api_messages = _messages_to_anthropic(messages)
+
+        async with self._client.messages.stream(**self._request(api_messages, api_tools, system_prompt)) as stream:
+            async for event in stream:
+                if event.type == "text":
+                    yield StreamEvent("text", text=event.text)
+            message = await stream.get_final_message()
+
+        log.debug(
+            "Anthropic API response (streamed):\n%s",
+            json.dumps(message.model_dump(), indent=2, default=str),
         )
 
+        response = _anthropic_response(message)
+        for tc in response.tool_calls:
+            yield StreamEvent("tool_call", tool_call=tc)
+        yield StreamEvent("done", response=response)
+
+
+def _anthropic_response(message: Any) -> LLMResponse:
+    """Build an LLMResponse from an Anthropic Message."""
+    text_parts: list[str] = []
+    tool_calls: list[ToolCall] = []
+
+    for block in message.content:
+        if block.type == "text":
+            text_parts.append(block.text)
+        elif block.type == "tool_use":
+            tool_calls.append(
+                ToolCall(
+                    id=block.id,
+                    name=block.name,
+                    arguments=block.input if isinstance(block.input, dict) else json.loads(block.input),
+                )
+            )
+
+    return LLMResponse(
+        text="\n".join(text_parts) if text_parts else None,
+        tool_calls=tool_calls,
+        usage=_anthropic_usage(getattr(message, "usage", None)),
+    )
+
 
 # ---------------------------------------------------------------------------
 # OpenAI implementation
@@ -162,13 +352,13 @@ def _mcp_tool_to_openai(tool: mcp_types.Tool) -> dict[str, Any]:
     }
 
 
-def _messages_to_openai(messages: list[Message], system_prompt: str) -> list[dict[str, Any]]:
-    """Convert our generic message list into OpenAI's chat format.
+def _messages_to_openai(messages: list[Message]) -> list[dict[str, Any]]:
+    """Convert our generic message list into OpenAI's chat format (without the system message).
 
     Handles translation from Anthropic-style content blocks (tool_use /
     tool_result) into OpenAI's assistant tool_calls + role=tool messages.
     """
-    out: list[dict[str, Any]] = [{"role": "system", "content": system_prompt}]
+    out: list[dict[str, Any]] = []
 
     for msg in messages:
         role = msg["role"]
@@ -218,8 +408,32 @@ def _messages_to_openai(messages: list[Message], system_prompt: str) -> list[dic
     return out
 
 
+def _openai_tools(tools: list[mcp_types.Tool]) -> tuple[list[dict[str, Any]], str]:
+    """OpenAI tool list plus a prompt_cache_key identifying the tool set."""
+    digest = hashlib.sha256("\n".join(tool.name for tool in tools).encode()).hexdigest()[:16]
+    return [_mcp_tool_to_openai(t) for t in tools], f"retreaver-{digest}"
+
+
+def _openai_usage(usage: Any) -> Usage | None:
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return Usage(
+        input_tokens=usage.prompt_tokens or 0,
+        output_tokens=usage.completion_tokens or 0,
+        cache_read_tokens=(getattr(details, "cached_tokens", None) or 0) if details else 0,
+    )
+
+
 class OpenAIProvider(LLMProvider):
-    """LLM provider backed by the OpenAI Chat Completions API."""
+    """LLM provider backed by the OpenAI Chat Completions API.
+
+    OpenAI caches long prompt prefixes automatically. Requests keep the
+    system prompt and tools first and unchanged, and send a
+    ``prompt_cache_key`` derived from the tool set so that rounds sharing the
+    prefix are routed to the same cache. The key goes in ``extra_body`` so
+    SDK versions that predate the parameter still accept the request.
+    """
 
     def __init__(self, model: str = "gpt-4o", api_key: str | None = None) -> None:
         from openai import AsyncOpenAI
@@ -227,21 +441,29 @@ class OpenAIProvider(LLMProvider):
         self.model = model
         self._client = AsyncOpenAI(api_key=api_key)  # reads OPENAI_API_KEY if None
 
-    async def complete(
-        self,
-        messages: list[Message],
-        tools: list[mcp_types.Tool],
-        system_prompt: str,
-    ) -> LLMResponse:
-        api_tools = [_mcp_tool_to_openai(t) for t in tools]
-        api_messages = _messages_to_openai(messages, system_prompt)
+    def _request(self, messages: list[Message], tools: list[mcp_types.Tool], system_prompt: str) -> dict[str, Any]:
+        api_tools, cache_key = self._tool_payload(tools, _openai_tools)
+        api_messages = [
+            {"role": "system", "content": system_prompt},
+            *self._convert_history(messages, _messages_to_openai),
+        ]
 
         kwargs: dict[str, Any] = {
             "model": self.model,
             "messages": api_messages,
+            "extra_body": {"prompt_cache_key": cache_key},
         }
         if api_tools:
             kwargs["tools"] = api_tools
+        return kwargs
+
+    async def complete(
+        self,
+        messages: list[Message],
+        tools: list[mcp_types.Tool],
+        system_prompt: str,
+    ) -> LLMResponse:
+        kwargs = self._request(messages, tools, system_prompt)
 
         log.debug(
             "OpenAI API request:\n%s",
@@ -270,7 +492,50 @@ class OpenAIProvider(LLMProvider):
                     )
                 )
 
-        return LLMResponse(text=text, tool_calls=tool_calls)
+        return LLMResponse(text=text, tool_calls=tool_calls, usage=_openai_usage(response.usage))
+
+    async def stream(
+        self,
+        messages: list[Message],
+        tools: list[mcp_types.Tool],
+        system_prompt: str,
+    ) -> AsyncIterator[StreamEvent]:
+        kwargs = self._request(messages, tools, system_prompt)
+        stream = await self._client.chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True}
+        )
+
+        usage = None
+        text_parts: list[str] = []
+        # Tool calls arrive as fragments keyed by index: id and name first, then argument chunks.
+        partial: dict[int, dict[str, Any]] = {}
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = _openai_usage(chunk.usage)  # sent on a final chunk with no choices
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                text_parts.append(delta.content)
+                yield StreamEvent("text", text=delta.content)
+            for tc in delta.tool_calls or []:
+                entry = partial.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+                if tc.id:
+                    entry["id"] = tc.id
+                if tc.function and tc.function.name:
+                    entry["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    entry["arguments"] += tc.function.arguments
+
+        tool_calls = [
+            ToolCall(id=entry["id"], name=entry["name"], arguments=json.loads(entry["arguments"] or "{}"))
+            for _, entry in sorted(partial.items())
+        ]
+        for tc in tool_calls:
+            yield StreamEvent("tool_call", tool_call=tc)
+        response = LLMResponse(text="".join(text_parts) or None, tool_calls=tool_calls, usage=usage)
+        log.debug("OpenAI API response (streamed): %r", response)
+        yield StreamEvent("done", response=response)
 
 
 # ---------------------------------------------------------------------------
@@ -358,7 +623,12 @@ def _messages_to_google(messages: list[Message]) -> list[Any]:
 
 
 class GoogleProvider(LLMProvider):
-    """LLM provider backed by Google's Gemini API."""
+    """LLM provider backed by Google's Gemini API.
+
+    Gemini 2.5 models cache repeated prompt prefixes implicitly; the system
+    instruction and tools are sent first and unchanged so every round of a
+    turn shares the longest possible prefix.
+    """
 
     def __init__(self, model: str = "gemini-2.5-flash", api_key: str | None = None) -> None:
         from google import genai
@@ -369,15 +639,10 @@ class GoogleProvider(LLMProvider):
         # Reads GOOGLE_API_KEY if api_key is None
         self._client = genai.Client(api_key=api_key)
 
-    async def complete(
-        self,
-        messages: list[Message],
-        tools: list[mcp_types.Tool],
-        system_prompt: str,
-    ) -> LLMResponse:
+    def _request(self, messages: list[Message], tools: list[mcp_types.Tool], system_prompt: str) -> dict[str, Any]:
         types = self._types
-        api_tool = _mcp_tool_to_google(tools) if tools else None
-        api_contents = _messages_to_google(messages)
+        api_tool = self._tool_payload(tools, lambda ts: _mcp_tool_to_google(ts) if ts else None)
+        api_contents = self._convert_history(messages, _messages_to_google)
 
         config = types.GenerateContentConfig(
             system_instruction=system_prompt,
@@ -390,34 +655,77 @@ class GoogleProvider(LLMProvider):
             "Google API request:\n  model=%s\n  system=%s\n  contents=%s\n  tools=%s",
             self.model, system_prompt[:200], repr(api_contents), repr(api_tool),
         )
+        return {"model": self.model, "contents": api_contents, "config": config}
 
-        response = await self._client.aio.models.generate_content(
-            model=self.model,
-            contents=api_contents,
-            config=config,
-        )
+    async def complete(
+        self,
+        messages: list[Message],
+        tools: list[mcp_types.Tool],
+        system_prompt: str,
+    ) -> LLMResponse:
+        response = await self._client.aio.models.generate_content(**self._request(messages, tools, system_prompt))
 
         log.debug("Google API response:\n%s", response)
 
         text_parts: list[str] = []
         tool_calls: list[ToolCall] = []
-
-        if response.candidates and response.candidates[0].content:
-            for part in response.candidates[0].content.parts:
-                if part.text:
-                    text_parts.append(part.text)
-                elif part.function_call:
-                    # Google has no tool-call ID — synthesize one from the name
-                    call_id = f"google_{part.function_call.name}_{len(tool_calls)}"
-                    tool_calls.append(
-                        ToolCall(
-                            id=call_id,
-                            name=part.function_call.name,
-                            arguments=dict(part.function_call.args) if part.function_call.args else {},
-                        )
-                    )
+        _google_parts(response, text_parts, tool_calls)
 
         return LLMResponse(
             text="\n".join(text_parts) if text_parts else None,
             tool_calls=tool_calls,
+            usage=_google_usage(response.usage_metadata),
         )
+
+    async def stream(
+        self,
+        messages: list[Message],
+        tools: list[mcp_types.Tool],
+        system_prompt: str,
+    ) -> AsyncIterator[StreamEvent]:
+        chunks = await self._client.aio.models.generate_content_stream(**self._request(messages, tools, system_prompt))
+
+        usage = None
+        text_parts: list[str] = []
+        tool_calls: list[ToolCall] = []
+        async for chunk in chunks:
+            if chunk.usage_metadata is not None:
+                usage = _google_usage(chunk.usage_metadata)  # cumulative; the last chunk has the totals
+            seen = len(text_parts)
+            _google_parts(chunk, text_parts, tool_calls)
+            for text in text_parts[seen:]:
+                yield StreamEvent("text", text=text)
+
+        for tc in tool_calls:
+            yield StreamEvent("tool_call", tool_call=tc)
+        response = LLMResponse(text="".join(text_parts) or None, tool_calls=tool_calls, usage=usage)
+        log.debug("Google API response (streamed): %r", response)
+        yield StreamEvent("done", response=response)
+
+
+def _google_usage(metadata: Any) -> Usage | None:
+    if metadata is None:
+        return None
+    return Usage(
+        input_tokens=metadata.prompt_token_count or 0,
+        output_tokens=metadata.candidates_token_count or 0,
+        cache_read_tokens=metadata.cached_content_token_count or 0,
+    )
+
+
+def _google_parts(response: Any, text_parts: list[str], tool_calls: list[ToolCall]) -> None:
+    """Append the text and function calls of a Gemini response (or stream chunk)."""
+    if response.candidates and response.candidates[0].content:
+        for part in response.candidates[0].content.parts or []:
+            if part.text:
+                text_parts.append(part.text)
+            elif part.function_call:
+                # Google has no tool-call ID — synthesize one from the name
+                call_id = f"google_{part.function_call.name}_{len(tool_calls)}"
+                tool_calls.append(
+                    ToolCall(
+                        id=call_id,
+                        name=part.function_call.name,
+                        arguments=dict(part.function_call.args) if part.function_call.args else {},
+                    )
+                )
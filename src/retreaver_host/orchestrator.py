@@ -7,20 +7,31 @@ final text response.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
+from collections.abc import Awaitable, Callable, Collection
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from mcp import ClientSessionGroup
 
-from .model_interface import LLMProvider, LLMResponse, Message
+from .model_interface import LLMProvider, LLMResponse, Message, MessageHistory, Usage
 
 log = logging.getLogger(__name__)
 
+# Receives progress events while a turn runs: {"type": "delta", "text": ...},
+# {"type": "tool_start", "id", "name"} and {"type": "tool_end", "id", "name", "is_error"}.
+EventCallback = Callable[[dict[str, Any]], Awaitable[None]]
+
 MAX_TOOL_ROUNDS = 15
 
+# Default cap on read-only tool calls run at once within one round
+# (override with MAX_PARALLEL_TOOL_CALLS).
+DEFAULT_PARALLEL_TOOL_CALLS = 4
+
 _BASE_SYSTEM_PROMPT = """\
 You are the Retreaver Assistant — an AI agent that helps users manage their \
 Retreaver call-tracking account.
@@ -63,7 +74,7 @@ SYSTEM_PROMPT = _load_system_prompt()
 class Conversation:
     """Holds the ordered list of messages for a single chat session."""
 
-    messages: list[Message] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=MessageHistory)
 
     def add_user_message(self, text: str) -> None:
         self.messages.append({"role": "user", "content": text})
@@ -92,62 +103,150 @@ class Conversation:
 # ---------------------------------------------------------------------------
 
 
+async def _call_tool(
+    tc: Any,
+    mcp_group: ClientSessionGroup,
+    round_num: int,
+    on_event: EventCallback | None = None,
+) -> dict[str, Any]:
+    """Run one tool call via MCP and return its tool_result block."""
+    log.info("Tool call [round %d]: %s(%s)", round_num + 1, tc.name, json.dumps(tc.arguments))
+    if on_event:
+        await on_event({"type": "tool_start", "id": tc.id, "name": tc.name})
+    try:
+        result = await mcp_group.call_tool(tc.name, tc.arguments)
+        # Serialize content blocks to a string for the LLM.
+        parts = []
+        for block in result.content:
+            if hasattr(block, "text"):
+                parts.append(block.text)
+            else:
+                parts.append(json.dumps(block.model_dump(), default=str))
+        content = "\n".join(parts) if parts else "(no output)"
+        is_error = result.isError
+    except Exception as exc:
+        log.exception("Tool call %s failed", tc.name)
+        content = f"Error: {exc}"
+        is_error = True
+
+    if on_event:
+        await on_event({"type": "tool_end", "id": tc.id, "name": tc.name, "is_error": bool(is_error)})
+    return {
+        "type": "tool_result",
+        "tool_use_id": tc.id,
+        "content": content,
+        "is_error": is_error,
+        "_function_name": tc.name,  # Used by Google provider for matching
+    }
+
+
+async def _call_tools(
+    tool_calls: list[Any],
+    mcp_group: ClientSessionGroup,
+    round_num: int,
+    read_only_tools: Collection[str],
+    semaphore: asyncio.Semaphore,
+    on_event: EventCallback | None = None,
+) -> list[dict[str, Any]]:
+    """Run a round's tool calls, returning their results in call order.
+
+    Consecutive read-only calls run concurrently (bounded by ``semaphore``);
+    any other call waits for everything before it and runs alone, so writes
+    stay serialized and never race the reads around them.
+    """
+
+    async def bounded(tc: Any) -> dict[str, Any]:
+        async with semaphore:
+            return await _call_tool(tc, mcp_group, round_num, on_event)
+
+    results: list[dict[str, Any]] = []
+    batch: list[Any] = []
+    for tc in [*tool_calls, None]:
+        if tc is not None and tc.name in read_only_tools:
+            batch.append(tc)
+            continue
+        if batch:
+            results.extend(await asyncio.gather(*(bounded(call) for call in batch)))
+            batch = []
+        if tc is not None:
+            results.append(await _call_tool(tc, mcp_group, round_num, on_event))
+    return results
+
+
+async def _stream_response(
+    llm: LLMProvider,
+    messages: list[Message],
+    tools: list[Any],
+    on_event: EventCallback,
+) -> LLMResponse:
+    """Stream one LLM response, forwarding text deltas to ``on_event``."""
+    response = None
+    async for event in llm.stream(messages, tools, SYSTEM_PROMPT):
+        if event.type == "text" and event.text:
+            await on_event({"type": "delta", "text": event.text})
+        elif event.type == "done":
+            response = event.response
+    return response or LLMResponse()
+
+
+def _log_usage(label: str, usage: Usage) -> None:
+    cached = 100 * usage.cache_read_tokens / usage.input_tokens if usage.input_tokens else 0.0
+    log.info(
+        "LLM usage [%s]: input=%d (cache read=%d, %.0f%%; cache write=%d) output=%d",
+        label, usage.input_tokens, usage.cache_read_tokens, cached, usage.cache_write_tokens, usage.output_tokens,
+    )
+
+
 async def run_turn(
     user_text: str,
     conversation: Conversation,
     llm: LLMProvider,
     mcp_group: ClientSessionGroup,
+    read_only_tools: Collection[str] = frozenset(),
+    on_event: EventCallback | None = None,
 ) -> str:
     """Execute one full user turn, including any tool-use rounds.
 
+    Tool calls named in ``read_only_tools`` may run concurrently within a
+    round; all others run one at a time. With ``on_event``, the LLM is
+    streamed and its text deltas and tool progress are reported as they happen.
+
     Returns the final assistant text reply.
     """
     conversation.add_user_message(user_text)
 
     tools = list(mcp_group.tools.values())
+    parallel = max(1, int(os.environ.get("MAX_PARALLEL_TOOL_CALLS", DEFAULT_PARALLEL_TOOL_CALLS)))
+    semaphore = asyncio.Semaphore(parallel)
+    usage = Usage()
 
     for round_num in range(MAX_TOOL_ROUNDS):
-        response = await llm.complete(conversation.messages, tools, SYSTEM_PROMPT)
+        if on_event:
+            response = await _stream_response(llm, conversation.messages, tools, on_event)
+        else:
+            response = await llm.complete(conversation.messages, tools, SYSTEM_PROMPT)
+        if response.usage:
+            usage += response.usage
+            _log_usage(f"round {round_num + 1}", response.usage)
 
         if not response.tool_calls:
             # No tool calls — we have a final text answer.
             text = response.text or ""
             if response.text:
                 conversation.add_assistant_message(response)
+            if round_num:
+                _log_usage("turn", usage)
             return text
 
         # Record the assistant turn that includes tool_use blocks.
         conversation.add_assistant_message(response)
 
-        # Execute each tool call via MCP.
-        tool_results: list[dict[str, Any]] = []
-        for tc in response.tool_calls:
-            log.info("Tool call [round %d]: %s(%s)", round_num + 1, tc.name, json.dumps(tc.arguments))
-            try:
-                result = await mcp_group.call_tool(tc.name, tc.arguments)
-                # Serialize content blocks to a string for the LLM.
-                parts = []
-                for block in result.content:
-                    if hasattr(block, "text"):
-                        parts.append(block.text)
-                    else:
-                        parts.append(json.dumps(block.model_dump(), default=str))
-                content = "\n".join(parts) if parts else "(no output)"
-                is_error = result.isError
-            except Exception as exc:
-                log.exception("Tool call %s failed", tc.name)
-                content = f"Error: {exc}"
-                is_error = True
-
-            tool_results.append({
-                "type": "tool_result",
-                "tool_use_id": tc.id,
-                "content": content,
-                "is_error": is_error,
-                "_function_name": tc.name,  # Used by Google provider for matching
-            })
-
+        # Execute the tool calls via MCP.
+        tool_results = await _call_tools(
+            response.tool_calls, mcp_group, round_num, read_only_tools, semaphore, on_event
+        )
         conversation.add_tool_results(tool_results)
 
     # Safety limit reached.
+    _log_usage("turn", usage)
     return "I'm sorry, I reached the maximum number of tool rounds for this turn. Please try a simpler request."
@@ -5,12 +5,20 @@ Accepts either plain text or JSON:
   -> {"text": "user message"}    (JSON)
   <- {"text": "assistant reply"}
   <- {"error": "description"}
+
+Streaming is opt-in per message with {"text": "...", "stream": true}; the
+reply is then preceded by progress frames:
+  <- {"type": "delta", "text": "partial text"}
+  <- {"type": "tool_start", "id": "...", "name": "tool_name"}
+  <- {"type": "tool_end", "id": "...", "name": "tool_name", "is_error": false}
+  <- {"text": "assistant reply"}          (always the last frame)
 """
 
 from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Collection
 from typing import Any
 
 import websockets
@@ -26,6 +34,7 @@ async def _handle_connection(
     ws: Any,
     llm: LLMProvider,
     mcp_group: ClientSessionGroup,
+    read_only_tools: Collection[str] = frozenset(),
 ) -> None:
     """Handle a single WebSocket connection with its own conversation state."""
     conversation = Conversation()
@@ -34,9 +43,11 @@ async def _handle_connection(
     async for raw in ws:
         try:
             # Accept both plain text and JSON {"text": "..."}
+            stream = False
             try:
                 msg = json.loads(raw)
                 user_text = msg.get("text", "").strip()
+                stream = msg.get("stream") is True
             except (json.JSONDecodeError, AttributeError):
                 user_text = raw.strip() if isinstance(raw, str) else raw.decode().strip()
 
@@ -45,7 +56,12 @@ async def _handle_connection(
                 continue
 
             log.info("User: %s", user_text[:120])
-            reply = await run_turn(user_text, conversation, llm, mcp_group)
+            on_event = None
+            if stream:
+                async def on_event(event: dict[str, Any]) -> None:
+                    await ws.send(json.dumps(event))
+
+            reply = await run_turn(user_text, conversation, llm, mcp_group, read_only_tools, on_event)
             await ws.send(json.dumps({"text": reply}))
 
         except Exception as exc:
@@ -58,11 +74,15 @@ async def start_ws_server(
     mcp_group: ClientSessionGroup,
     host: str = "0.0.0.0",
     port: int = 8080,
+    read_only_tools: Collection[str] = frozenset(),
 ) -> Any:
-    """Start the WebSocket server and return the server object."""
+    """Start the WebSocket server and return the server object.
+
+    ``read_only_tools`` names the tools that are safe to run concurrently.
+    """
 
     async def handler(ws: Any) -> None:
-        await _handle_connection(ws, llm, mcp_group)
+        await _handle_connection(ws, llm, mcp_group, read_only_tools)
 
     server = await websockets.serve(handler, host, port)
     log.info("WebSocket server listening on ws://%s:%d", host, port)
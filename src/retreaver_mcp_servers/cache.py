@@ -0,0 +1,131 @@
+"""In-memory TTL + validator cache for Retreaver GET responses."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+# Query parameters that identify the caller rather than the resource.
+_AUTH_PARAMS = frozenset({"api_key", "company_id"})
+
+# Endpoints whose data changes too often to serve from cache unless the
+# operator explicitly configures a TTL for them.
+_DEFAULT_TTLS: dict[str, float] = {
+    "/calls": 0,
+    "/api/v2/calls": 0,
+    "/api/v3/calls": 0,
+    "/reports": 0,
+}
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """LRU-bounded response cache with per-endpoint TTLs.
+
+    Stale entries are kept (until evicted) so their ``ETag`` /
+    ``Last-Modified`` validators can be used for a conditional request.
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 60.0,
+        ttls: dict[str, float] | None = None,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        # Longest prefix wins, so sort once up front.
+        merged = {**_DEFAULT_TTLS, **(ttls or {})}
+        self._ttls = sorted(merged.items(), key=lambda kv: len(kv[0]), reverse=True)
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self.counters: dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def parse_ttls(spec: str) -> dict[str, float]:
+        """Parse ``"/campaigns.json=600,/targets=300"`` into a prefix → TTL map."""
+        ttls: dict[str, float] = {}
+        for item in spec.split(","):
+            prefix, sep, seconds = item.strip().partition("=")
+            if sep and prefix:
+                ttls["/" + prefix.strip().lstrip("/")] = float(seconds)
+        return ttls
+
+    @staticmethod
+    def key(path: str, params: dict | None) -> CacheKey:
+        items = tuple(sorted(
+            (k, str(v)) for k, v in (params or {}).items() if k not in _AUTH_PARAMS
+        ))
+        return ("/" + path.lstrip("/"), items)
+
+    def ttl_for(self, path: str) -> float:
+        path = "/" + path.lstrip("/")
+        for prefix, ttl in self._ttls:
+            if path.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: CacheKey) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(
+        self,
+        key: CacheKey,
+        value: Any,
+        ttl: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        self._entries[key] = CacheEntry(value, time.monotonic() + ttl, etag, last_modified)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def refresh(self, key: CacheKey, entry: CacheEntry, ttl: float) -> None:
+        """Extend an entry's lifetime after a 304 Not Modified."""
+        entry.expires_at = time.monotonic() + ttl
+        self.counters["revalidated"] += 1
+
+    def invalidate(self, prefix: str) -> None:
+        """Drop every entry whose path starts with ``prefix``."""
+        prefix = "/" + prefix.lstrip("/")
+        stale = [key for key in self._entries if key[0].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        self.counters["invalidations"] += len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else None,
+            **self.counters,
+        }
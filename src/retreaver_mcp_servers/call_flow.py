@@ -0,0 +1,231 @@
+"""Decode call flow events into a timeline, an outcome and a compact verdict.
+
+The API does not document the shape of ``call_flow_events``, so events are
+read defensively: each event's kind, time and message are taken from the
+first of several likely field names, and the outcome is classified from the
+text of those fields.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime
+
+from .warehouse import parse_timestamp
+
+_TIME_FIELDS = ("created_at", "timestamp", "time", "occurred_at", "at")
+_KIND_FIELDS = ("event", "event_type", "type", "name", "action", "kind")
+_MESSAGE_FIELDS = ("message", "description", "details", "detail", "text", "reason", "note")
+_TARGET_FIELDS = ("target_name", "target", "tid", "target_id")
+
+_CAP_RE = re.compile(r"\bcap(s|ped)?\b|limit (was )?(reached|hit|exceeded)|concurrency|max(imum)? calls", re.I)
+_REJECT_RE = re.compile(
+    r"reject|declin|no bid|not eligible|ineligible|blocked|suppress|blacklist|duplicate|"
+    r"outside|closed|hours of operation|no (available )?targets?|unavailable|filtered|denied|fail",
+    re.I,
+)
+_RTB_RE = re.compile(r"\brtb\b|\bbid|\bping\b", re.I)
+_ROUTE_RE = re.compile(r"forward|rout|dial|transfer|connect", re.I)
+_BID_RE = re.compile(r"bid", re.I)
+_AMOUNT_RE = re.compile(r"\$?\s*(\d+(?:\.\d+)?)")
+
+
+def _unwrap(record: object) -> dict:
+    if isinstance(record, dict):
+        inner = record.get("call")
+        return inner if isinstance(inner, dict) else record
+    return {}
+
+
+def calls_in(result: object) -> list[dict]:
+    """Every call record in an API response: a single call, a list, or a data/pagination page."""
+    if isinstance(result, dict) and isinstance(result.get("data"), list):
+        result = result["data"]
+    if isinstance(result, list):
+        return [call for call in map(_unwrap, result) if call]
+    call = _unwrap(result)
+    return [call] if call.get("uuid") else []
+
+
+def _first(event: dict, fields: tuple[str, ...]) -> object:
+    for field in fields:
+        value = event.get(field)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def events_in(call: dict) -> list[dict]:
+    """The call's flow events as plain dicts, unwrapping ``{"call_flow_event": {...}}`` items."""
+    events = call.get("call_flow_events") or call.get("events") or []
+    if isinstance(events, dict):
+        events = events.get("data") or list(events.values())
+    out = []
+    for event in events if isinstance(events, list) else []:
+        if isinstance(event, dict) and len(event) == 1 and isinstance(next(iter(event.values())), dict):
+            event = next(iter(event.values()))
+        if isinstance(event, dict):
+            out.append(event)
+        elif isinstance(event, str):
+            out.append({"message": event})
+    return out
+
+
+def _parse_time(value: object) -> datetime | None:
+    try:
+        return parse_timestamp(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+def timeline(events: list[dict]) -> list[dict]:
+    """One short entry per event: seconds since the first event, kind and message."""
+    times = [_parse_time(_first(event, _TIME_FIELDS)) for event in events]
+    start = min((t for t in times if t is not None), default=None)
+    entries: list[dict] = []
+    for event, at in zip(events, times):
+        entry: dict = {}
+        if at is not None and start is not None:
+            entry["t"] = round((at - start).total_seconds(), 1)
+        kind = _first(event, _KIND_FIELDS)
+        message = _first(event, _MESSAGE_FIELDS)
+        target = _first(event, _TARGET_FIELDS)
+        if kind is not None:
+            entry["event"] = str(kind)
+        if message is not None and message != kind:
+            entry["detail"] = str(message) if not isinstance(message, (dict, list)) else message
+        if target is not None:
+            entry["target"] = target
+        if entries and {k: v for k, v in entries[-1].items() if k != "t"} == {k: v for k, v in entry.items() if k != "t"}:
+            continue  # collapse repeated events (e.g. retries of the same ping)
+        entries.append(entry)
+    return entries
+
+
+def _text(entry: dict) -> str:
+    return f"{entry.get('event', '')} {entry.get('detail', '')}".strip()
+
+
+def outcome(call: dict, events: list[dict] | None = None) -> dict:
+    """Classify the timeline into routed target, rejections, caps hit and RTB bid results."""
+    entries = timeline(events_in(call) if events is None else events)
+    rejections: list[str] = []
+    caps: list[str] = []
+    bids: list[dict] = []
+    routed = call.get("target_name") or call.get("tid")
+    for entry in entries:
+        text = _text(entry)
+        if not text:
+            continue
+        if _RTB_RE.search(text):
+            bid: dict = {"detail": text}
+            if entry.get("target") is not None:
+                bid["target"] = entry["target"]
+            mention = _BID_RE.search(text)
+            amount = _AMOUNT_RE.search(text, mention.end()) if mention else None
+            if amount:
+                bid["bid"] = float(amount.group(1))
+            bid["accepted"] = not _REJECT_RE.search(text)
+            bids.append(bid)
+        elif _CAP_RE.search(text):
+            caps.append(text)
+        elif _REJECT_RE.search(text):
+            rejections.append(text)
+        elif _ROUTE_RE.search(text) and entry.get("target") is not None:
+            routed = entry["target"]
+
+    result: dict = {"connected": connected(call)}
+    if routed is not None:
+        result["routed_target"] = routed
+    if rejections:
+        result["rejections"] = rejections
+    if caps:
+        result["caps_hit"] = caps
+    if bids:
+        result["rtb"] = bids
+    result["reason"] = _reason(call, result)
+    return result
+
+
+def _reason(call: dict, result: dict) -> str:
+    if result["connected"]:
+        return reason(call)
+    if result.get("caps_hit"):
+        return f"cap reached: {result['caps_hit'][-1]}"
+    if result.get("rejections"):
+        return f"rejected: {result['rejections'][-1]}"
+    bids = result.get("rtb") or []
+    if bids and not any(bid["accepted"] for bid in bids):
+        return f"no accepted RTB bid ({len(bids)} tried)"
+    return reason(call)
+
+
+def _number(value: object) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def connected(call: dict) -> bool:
+    """Whether the caller was bridged to a target."""
+    if call.get("connected") is not None:
+        return bool(call["connected"])
+    return bool(call.get("forwarded_time")) or _number(call.get("dialed_call_duration")) > 0
+
+
+def reason(call: dict) -> str:
+    """One-line explanation of how the call ended, from the call's own fields."""
+    target = call.get("target_name") or call.get("tid")
+    if connected(call):
+        text = f"connected to {target or 'a target'} for {_number(call.get('dialed_call_duration')):.0f}s"
+        if call.get("converted"):
+            text += ", converted"
+        return text
+    if call.get("status") not in (None, "finished", "completed"):
+        return f"call status {call['status']}"
+    if call.get("duplicate"):
+        return "duplicate call, not routed"
+    hung_up_by = call.get("hung_up_by")
+    if target:
+        return f"routed to {target} but never answered" + (f" (hung up by {hung_up_by})" if hung_up_by else "")
+    text = "never routed to a target"
+    if hung_up_by:
+        text += f"; {hung_up_by} hung up after {_number(call.get('total_duration')):.0f}s"
+    return text
+
+
+def verdict(call: dict, decoded: dict | None = None) -> dict:
+    """A few fields that answer "did it connect, and why (not)".
+
+    ``decoded`` is the call's :func:`outcome`, if already computed.
+    """
+    decoded = outcome(call) if decoded is None else decoded
+    out = {
+        "uuid": call.get("uuid"),
+        "caller": call.get("caller"),
+        "created_at": call.get("created_at"),
+        "campaign": call.get("campaign_name") or call.get("cid"),
+        "connected": decoded["connected"],
+        "reason": decoded["reason"],
+    }
+    return {key: value for key, value in out.items() if value is not None}
+
+
+def decode(call: dict, raw: bool = False) -> dict:
+    """Verdict, computed outcome and compact timeline for one call.
+
+    The raw events are included if ``raw``, and also whenever none of them
+    could be read (their field names are not ones this module knows), so no
+    information is lost to an unrecognized event format.
+    """
+    events = events_in(call)
+    result = outcome(call, events)
+    entries = timeline(events)
+    decoded = {**verdict(call, result), "outcome": result, "timeline": entries}
+    result.pop("connected")
+    result.pop("reason")
+    unreadable = bool(events) and not any("event" in entry or "detail" in entry for entry in entries)
+    if raw or unreadable:
+        decoded["call_flow_events"] = call.get("call_flow_events") or call.get("events")
+    return decoded
@@ -0,0 +1,114 @@
+"""Single-pass group-by aggregation over call records for the summarize_calls tool.
+
+The same aggregation serves calls fetched from the API and rows read from
+the local warehouse.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+from .warehouse import ROW_FIELDS, call_fields
+
+# group_by name -> function of a flattened call row returning the group value.
+GROUP_KEYS = {
+    "campaign": lambda row: row["cid"],
+    "target": lambda row: row["tid"],
+    "affiliate": lambda row: row["afid"],
+    "sub_id": lambda row: row["sub_id"],
+    "status": lambda row: row["status"],
+    "connected": lambda row: bool(row["connected"]),
+    "converted": lambda row: bool(row["converted"]),
+    "day": lambda row: row["created_at"][:10],
+    "hour": lambda row: row["created_at"][:13],
+}
+
+COLUMNS = (
+    "calls", "connected", "converted", "conversion_rate", "revenue", "payout", "profit",
+    "duration_avg", "duration_p50", "duration_p90", "duration_max",
+)
+
+
+def flatten(call: dict) -> dict:
+    """Flatten an API call record (wrapped in {"call": ...} or not) to warehouse column names."""
+    call = call.get("call", call)
+    return dict(zip(ROW_FIELDS, call_fields(call)))
+
+
+def _percentile(ordered: list[float], pct: float) -> float | None:
+    if not ordered:
+        return None
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class _Group:
+    __slots__ = ("calls", "connected", "converted", "revenue", "payout", "durations")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.connected = 0
+        self.converted = 0
+        self.revenue = 0.0
+        self.payout = 0.0
+        self.durations: list[float] = []
+
+    def add(self, row: dict) -> None:
+        self.calls += 1
+        self.connected += bool(row["connected"])
+        self.converted += bool(row["converted"])
+        self.revenue += row["revenue"] or 0.0
+        self.payout += row["payout"] or 0.0
+        if row["total_duration"] is not None:
+            self.durations.append(row["total_duration"])
+
+    def values(self) -> list:
+        durations = sorted(self.durations)
+        return [
+            self.calls,
+            self.connected,
+            self.converted,
+            round(self.converted / self.calls, 4) if self.calls else None,
+            round(self.revenue, 2),
+            round(self.payout, 2),
+            round(self.revenue - self.payout, 2),
+            round(sum(durations) / len(durations), 1) if durations else None,
+            _percentile(durations, 50),
+            _percentile(durations, 90),
+            durations[-1] if durations else None,
+        ]
+
+
+def summarize(rows: Iterable[dict], group_by: list[str], limit: int | None = None) -> dict:
+    """Aggregate flattened call rows into a compact table.
+
+    Returns ``{"columns": [...], "rows": [[...], ...], "totals": {...}}`` where
+    each row starts with the group_by values, sorted by call count descending.
+    """
+    key_fns = [GROUP_KEYS[key] for key in group_by]
+    groups: dict[tuple, _Group] = {}
+    total = _Group()
+    for row in rows:
+        key = tuple(fn(row) for fn in key_fns)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = _Group()
+        group.add(row)
+        total.add(row)
+
+    table = sorted(
+        ([*key, *group.values()] for key, group in groups.items()),
+        key=lambda r: r[len(group_by)],
+        reverse=True,
+    )
+    # A group key named like a metric (connected, converted) gets a prefix.
+    key_columns = [f"group_{key}" if key in COLUMNS else key for key in group_by]
+    result = {
+        "columns": [*key_columns, *COLUMNS],
+        "rows": table[:limit] if limit else table,
+        "totals": dict(zip(COLUMNS, total.values())),
+    }
+    if limit and len(table) > limit:
+        result["truncated_groups"] = len(table) - limit
+    return result
@@ -2,16 +2,76 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import logging
 import os
+import random
 import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
 
 import httpx
 from dotenv import load_dotenv
 
+from .cache import CacheKey, ResponseCache
+from .ratelimit import limiter_for
+from .singleflight import SingleFlight
+
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 DEFAULT_BASE_URL = "https://api.retreaver.com"
 
+# Retry policy. 429 responses are retried for every method because the
+# server rejected them before doing any work; 5xx responses and transport
+# errors are only retried for idempotent methods.
+MAX_RETRIES = int(os.environ.get("RETREAVER_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.environ.get("RETREAVER_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.environ.get("RETREAVER_BACKOFF_CAP", "30"))
+
+# Connection pool and transport tuning for the shared httpx client.
+HTTP_MAX_CONNECTIONS = int(os.environ.get("RETREAVER_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("RETREAVER_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("RETREAVER_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("RETREAVER_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.environ.get("RETREAVER_HTTP_READ_TIMEOUT", "30"))
+HTTP_WRITE_TIMEOUT = float(os.environ.get("RETREAVER_HTTP_WRITE_TIMEOUT", "30"))
+HTTP_POOL_TIMEOUT = float(os.environ.get("RETREAVER_HTTP_POOL_TIMEOUT", "30"))
+HTTP2 = os.environ.get("RETREAVER_HTTP2", "").lower() in ("1", "true", "yes")
+# "auto" advertises every encoding httpx can decode here (gzip/deflate, plus
+# br and zstd when the brotli / zstandard packages are installed).
+HTTP_COMPRESSION = os.environ.get("RETREAVER_HTTP_COMPRESSION", "auto")
+
+_IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+_RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+
+
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def _http2_available() -> bool:
+    """Return True if the optional ``h2`` package needed for HTTP/2 is installed."""
+    if _module_available("h2"):
+        return True
+    log.warning("RETREAVER_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+    return False
+
+
+def _accept_encoding() -> str:
+    """Build the Accept-Encoding header from RETREAVER_HTTP_COMPRESSION."""
+    if HTTP_COMPRESSION.lower() != "auto":
+        return HTTP_COMPRESSION
+    encodings = ["gzip", "deflate"]
+    if _module_available("brotli") or _module_available("brotlicffi"):
+        encodings.append("br")
+    if _module_available("zstandard"):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
 
 class RetreaverClient:
     """Thin wrapper around httpx.AsyncClient that injects auth params."""
@@ -21,12 +81,32 @@ class RetreaverClient:
         self.company_id = os.environ["RETREAVER_COMPANY_ID"]
         self.base_url = os.environ.get("RETREAVER_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
         self._client: httpx.AsyncClient | None = None
+        self._limiter = limiter_for(self.api_key)
+        self._cache: ResponseCache | None = None
+        if os.environ.get("RETREAVER_CACHE", "").lower() in ("1", "true", "yes"):
+            self._cache = ResponseCache(
+                max_entries=int(os.environ.get("RETREAVER_CACHE_MAX_ENTRIES", "1024")),
+                default_ttl=float(os.environ.get("RETREAVER_CACHE_TTL", "60")),
+                ttls=ResponseCache.parse_ttls(os.environ.get("RETREAVER_CACHE_TTLS", "")),
+            )
+        self._inflight = SingleFlight()
 
     async def _ensure_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
-                timeout=30.0,
-                headers={"Accept": "application/json"},
+                timeout=httpx.Timeout(
+                    connect=HTTP_CONNECT_TIMEOUT,
+                    read=HTTP_READ_TIMEOUT,
+                    write=HTTP_WRITE_TIMEOUT,
+                    pool=HTTP_POOL_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=HTTP2 and _http2_available(),
+                headers={"Accept": "application/json", "Accept-Encoding": _accept_encoding()},
             )
         return self._client
 
@@ -38,30 +118,140 @@ class RetreaverClient:
             return path
         return f"{self.base_url}/{path.lstrip('/')}"
 
-    async def get(self, path: str, params: dict | None = None) -> dict | list:
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json: dict | None = None,
+        headers: dict | None = None,
+    ) -> httpx.Response:
+        """Send a request through the shared rate limiter, retrying throttles and transient failures."""
         client = await self._ensure_client()
         merged = {**self._auth_params(), **(params or {})}
-        resp = await client.get(self._url(path), params=merged)
-        return self._handle(resp)
+        url = self._url(path)
+        idempotent = method in _IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            await self._limiter.acquire()
+            try:
+                resp = await client.request(method, url, params=merged, json=json, headers=headers)
+            except httpx.TransportError as exc:
+                if not idempotent or attempt >= MAX_RETRIES:
+                    raise
+                delay = self._backoff(attempt)
+                log.warning("%s %s failed (%s), retrying in %.1fs", method, path, exc, delay)
+            else:
+                if resp.status_code == 429:
+                    retry_after = self._parse_retry_after(resp.headers.get("retry-after"))
+                    self._limiter.on_throttle(retry_after)
+                    if attempt >= MAX_RETRIES:
+                        return resp
+                    delay = self._backoff(attempt)
+                    log.warning(
+                        "%s %s throttled (retry-after=%s), rate now %.2f/s",
+                        method, path, retry_after, self._limiter.rate,
+                    )
+                elif resp.status_code in _RETRYABLE_STATUSES and idempotent and attempt < MAX_RETRIES:
+                    retry_after = self._parse_retry_after(resp.headers.get("retry-after"))
+                    delay = max(retry_after or 0.0, self._backoff(attempt))
+                    log.warning("%s %s returned %d, retrying in %.1fs", method, path, resp.status_code, delay)
+                else:
+                    self._limiter.on_success()
+                    return resp
+            self._limiter.counters["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        """Parse a Retry-After header given either as seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    async def get(self, path: str, params: dict | None = None) -> dict | list:
+        """GET ``path``; identical concurrent calls share one upstream request and result."""
+        key = ResponseCache.key(path, params)
+        return await self._inflight.do(key, partial(self._get, key, path, params))
+
+    async def _get(self, key: CacheKey, path: str, params: dict | None) -> dict | list:
+        cache = self._cache
+        ttl = cache.ttl_for(path) if cache else 0
+        if not ttl:
+            resp = await self._request("GET", path, params=params)
+            return self._handle(resp)
+
+        entry = cache.lookup(key)
+        if entry is not None and entry.fresh:
+            cache.counters["hits"] += 1
+            return entry.value
+
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        resp = await self._request("GET", path, params=params, headers=headers or None)
+        if resp.status_code == 304 and entry is not None:
+            cache.refresh(key, entry, ttl)
+            return entry.value
+
+        cache.counters["misses"] += 1
+        value = self._handle(resp)
+        cache.store(key, value, ttl, resp.headers.get("etag"), resp.headers.get("last-modified"))
+        return value
 
     async def post(self, path: str, json: dict | None = None, params: dict | None = None) -> dict | list:
-        client = await self._ensure_client()
-        merged_params = {**self._auth_params(), **(params or {})}
-        resp = await client.post(self._url(path), json=json, params=merged_params)
+        resp = await self._request("POST", path, params=params, json=json)
+        self.invalidate(path)
         return self._handle(resp)
 
     async def put(self, path: str, json: dict | None = None, params: dict | None = None) -> dict | list:
-        client = await self._ensure_client()
-        merged_params = {**self._auth_params(), **(params or {})}
-        resp = await client.put(self._url(path), json=json, params=merged_params)
+        resp = await self._request("PUT", path, params=params, json=json)
+        self.invalidate(path)
         return self._handle(resp)
 
     async def delete(self, path: str, params: dict | None = None) -> dict | list | str:
-        client = await self._ensure_client()
-        merged = {**self._auth_params(), **(params or {})}
-        resp = await client.delete(self._url(path), params=merged)
+        resp = await self._request("DELETE", path, params=params)
+        self.invalidate(path)
         return self._handle(resp)
 
+    def invalidate(self, path: str) -> None:
+        """Drop cached GETs for the resource a write touched (e.g. "/targets" for "/targets/5.json")."""
+        if self._cache is None:
+            return
+        segments = [seg for seg in path.split("?")[0].split("/") if seg]
+        if segments and segments[0] == "api" and len(segments) >= 3:
+            segments = segments[:3]  # /api/v2/<resource>
+        else:
+            segments = segments[:1]
+        resource = "/" + "/".join(segments)
+        self._cache.invalidate(resource.removesuffix(".json"))
+
+    def stats(self) -> dict:
+        """Return client-side counters (rate limiter, retries, request coalescing, cache hits)."""
+        stats: dict = {"rate_limiter": self._limiter.snapshot(), "coalescing": self._inflight.snapshot()}
+        if self._cache is not None:
+            stats["cache"] = self._cache.snapshot()
+        return stats
+
     @staticmethod
     def _parse_link_header(header: str) -> dict[str, int]:
         """Extract page numbers from a Link header.
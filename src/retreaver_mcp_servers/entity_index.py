@@ -0,0 +1,312 @@
+"""Resident in-memory index of Retreaver account entities.
+
+Keeps targets, campaigns, affiliates, numbers, number pools and target
+groups in memory so that lookups by id / customer ID / phone number / name
+are dictionary hits instead of a full paginated scrape. The index is
+refreshed on a schedule in the background, patched in place when the write
+server reports a change, and optionally persisted to an SQLite snapshot so
+a restart starts warm.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from .fuzzy import FuzzyIndex
+from .snapshot import EntitySnapshot
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """How to load and key one entity kind."""
+
+    path: str
+    resource_key: str
+    keys: tuple[str, ...]
+    names: tuple[str, ...] = ()
+    phone_keys: tuple[str, ...] = ()
+
+
+ENTITY_SPECS: dict[str, EntitySpec] = {
+    "targets": EntitySpec("/targets.json", "target", ("id", "tid"), ("name",), ("number",)),
+    "campaigns": EntitySpec("/campaigns.json", "campaign", ("id", "cid"), ("name",)),
+    "affiliates": EntitySpec("/affiliates.json", "affiliate", ("id", "afid"), ("company_name", "first_name")),
+    "numbers": EntitySpec("/numbers.json", "number", ("id",), (), ("number",)),
+    "number_pools": EntitySpec("/number_pools.json", "number_pool", ("id",), ("name",)),
+    "target_groups": EntitySpec("/target_groups.json", "target_group", ("id",), ("name",)),
+}
+
+Loader = Callable[[str, str], Awaitable[list]]
+
+
+def normalize_phone(value: object) -> str:
+    """Reduce a phone number to its digits, dropping a leading NANP ``1``."""
+    digits = re.sub(r"\D", "", str(value))
+    if len(digits) == 11 and digits.startswith("1"):
+        return digits[1:]
+    return digits
+
+
+def _normalize(value: object) -> str:
+    return str(value).strip().lower()
+
+
+class _Collection:
+    """Records of one kind plus their lookup tables."""
+
+    def __init__(self, spec: EntitySpec, records: list[dict], loaded_at: float | None = None) -> None:
+        self.spec = spec
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+        self._records: dict[str, dict] = {}
+        self._lookup: dict[str, dict[str, dict]] = {f: {} for f in (*spec.keys, *spec.phone_keys)}
+        for record in records:
+            self._add(record)
+        self._list: list[dict] | None = None
+        self._fuzzy: FuzzyIndex[dict] | None = None
+
+    def _identity(self, record: dict) -> str:
+        for field in self.spec.keys:
+            if record.get(field) is not None:
+                return f"{field}:{_normalize(record[field])}"
+        return f"obj:{id(record)}"
+
+    def _add(self, record: dict) -> None:
+        self._records[self._identity(record)] = record
+        for field in self.spec.keys:
+            if record.get(field) is not None:
+                self._lookup[field][_normalize(record[field])] = record
+        for field in self.spec.phone_keys:
+            if record.get(field):
+                self._lookup[field][normalize_phone(record[field])] = record
+
+    def _drop(self, record: dict) -> None:
+        self._records.pop(self._identity(record), None)
+        for field, table in self._lookup.items():
+            value = record.get(field)
+            if value is None:
+                continue
+            key = normalize_phone(value) if field in self.spec.phone_keys else _normalize(value)
+            if table.get(key) is record:
+                del table[key]
+
+    def by_identity(self) -> dict[str, dict]:
+        return dict(self._records)
+
+    def records(self) -> list[dict]:
+        if self._list is None:
+            self._list = list(self._records.values())
+        return self._list
+
+    def fuzzy(self) -> FuzzyIndex[dict]:
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(
+                (record.get(field) or "", record)
+                for record in self.records()
+                for field in self.spec.names
+            )
+        return self._fuzzy
+
+    def get(self, field: str, value: object) -> dict | None:
+        table = self._lookup.get(field)
+        if table is None:
+            return None
+        key = normalize_phone(value) if field in self.spec.phone_keys else _normalize(value)
+        return table.get(key)
+
+    def upsert(self, record: dict) -> None:
+        if all(record.get(field) is None for field in self.spec.keys):
+            return  # nothing to key it by; the next full reload will pick it up
+        existing = None
+        for field in self.spec.keys:
+            if record.get(field) is not None:
+                existing = self.get(field, record[field])
+                if existing is not None:
+                    break
+        if existing is not None:
+            self._drop(existing)
+            record = {**existing, **record}  # never mutate a record callers may hold
+        self._add(record)
+        self._list = None
+        self._fuzzy = None
+
+    def remove(self, field: str, value: object) -> bool:
+        existing = self.get(field, value)
+        if existing is None:
+            return False
+        self._drop(existing)
+        self._list = None
+        self._fuzzy = None
+        return True
+
+
+class EntityIndex:
+    """In-memory index of account entities, kept warm by a background task.
+
+    Records are shared with every caller and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        loader: Loader,
+        refresh_seconds: float = 300.0,
+        snapshot: EntitySnapshot | None = None,
+    ) -> None:
+        self._loader = loader
+        self.refresh_seconds = refresh_seconds
+        self._snapshot = snapshot
+        self._collections: dict[str, _Collection] = {}
+        self._task: asyncio.Task | None = None
+        # Write patches that arrive while a reload of that kind is in flight are
+        # journaled and replayed on top of the reloaded data.
+        self._loading: dict[str, int] = {kind: 0 for kind in ENTITY_SPECS}
+        self._patches: dict[str, list[tuple[float, dict]]] = {kind: [] for kind in ENTITY_SPECS}
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self) -> None:
+        """Load the on-disk snapshot, then build and refresh the index in the background."""
+        if self._snapshot is not None:
+            await self.load_snapshot()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def load_snapshot(self) -> None:
+        """Populate collections from the SQLite snapshot, keeping their original sync time."""
+        for kind, spec in ENTITY_SPECS.items():
+            try:
+                loaded = await asyncio.to_thread(self._snapshot.load, kind)
+            except Exception as exc:
+                log.warning("Entity index: reading snapshot for %s failed: %s", kind, exc)
+                continue
+            if loaded is not None and kind not in self._collections:
+                records, synced_at = loaded
+                self._collections[kind] = _Collection(spec, records, loaded_at=synced_at)
+                log.info("Entity index: restored %d %s from snapshot (%.0fs old)",
+                         len(records), kind, time.time() - synced_at)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            due = [
+                kind for kind in ENTITY_SPECS
+                if self.age(kind) is None or (self.refresh_seconds > 0 and self.age(kind) >= self.refresh_seconds)
+            ]
+            await self.refresh_all(due)
+            if self.refresh_seconds <= 0:
+                return
+            oldest = max((self.age(kind) or 0.0) for kind in ENTITY_SPECS)
+            await asyncio.sleep(max(1.0, self.refresh_seconds - oldest))
+
+    async def refresh(self, kind: str) -> None:
+        """Reload every record of ``kind`` from the API."""
+        spec = ENTITY_SPECS[kind]
+        started = time.time()
+        self._loading[kind] += 1
+        try:
+            records = await self._loader(spec.path, spec.resource_key)
+        finally:
+            self._loading[kind] -= 1
+        collection = _Collection(spec, records)
+        for t, patch in self._patches[kind]:
+            if t >= started:
+                self._apply(collection, patch)
+        if not self._loading[kind]:
+            self._patches[kind].clear()
+        self._collections[kind] = collection
+        log.info("Entity index: loaded %d %s", len(records), kind)
+        if self._snapshot is not None:
+            try:
+                counts = await asyncio.to_thread(
+                    self._snapshot.sync, kind, collection.by_identity(), collection.loaded_at
+                )
+                log.debug("Entity index: snapshot %s %s", kind, counts)
+            except Exception as exc:
+                log.warning("Entity index: writing snapshot for %s failed: %s", kind, exc)
+
+    async def refresh_all(self, kinds: list[str] | None = None) -> None:
+        kinds = list(ENTITY_SPECS) if kinds is None else kinds
+        results = await asyncio.gather(*(self.refresh(kind) for kind in kinds), return_exceptions=True)
+        for kind, result in zip(kinds, results):
+            if isinstance(result, Exception):
+                log.warning("Entity index: refreshing %s failed: %s", kind, result)
+
+    async def _ensure(self, kind: str, max_age: float | None) -> _Collection:
+        """Return the collection for ``kind``, reloading it if missing or older than ``max_age``."""
+        age = self.age(kind)
+        if age is None:
+            await self.refresh(kind)
+        elif max_age is not None and age > max_age:
+            try:
+                await self.refresh(kind)
+            except Exception as exc:
+                log.warning("Entity index: %s is %.0fs old and reload failed (%s); serving stale data",
+                            kind, age, exc)
+        return self._collections[kind]
+
+    # -- reads -------------------------------------------------------------
+
+    def ready(self, kind: str) -> bool:
+        return kind in self._collections
+
+    def age(self, kind: str) -> float | None:
+        """Seconds since ``kind`` was last fully loaded, or None if never."""
+        collection = self._collections.get(kind)
+        return None if collection is None else time.time() - collection.loaded_at
+
+    async def records(self, kind: str, max_age: float | None = None) -> list[dict]:
+        """Return every record of ``kind``, loading it first if cold or older than ``max_age`` seconds."""
+        return (await self._ensure(kind, max_age)).records()
+
+    async def get(self, kind: str, field: str, value: object, max_age: float | None = None) -> dict | None:
+        """Look up one record by an indexed field (e.g. "id", "cid", "number")."""
+        return (await self._ensure(kind, max_age)).get(field, value)
+
+    async def search(
+        self,
+        kind: str,
+        text: str,
+        limit: int = 25,
+        max_age: float | None = None,
+    ) -> list[tuple[float, dict]]:
+        """Fuzzy-rank records of ``kind`` by name, returning ``(score, record)`` best first.
+
+        Exact, prefix and substring matches outrank typo-tolerant trigram matches.
+        """
+        return (await self._ensure(kind, max_age)).fuzzy().search(text, limit=limit)
+
+    # -- write patches -----------------------------------------------------
+
+    def apply_patch(self, patch: dict) -> None:
+        """Apply a change notification ``{"kind", "record"}`` or ``{"kind", "deleted": {field: value}}``."""
+        kind = patch.get("kind") if isinstance(patch, dict) else None
+        if kind not in ENTITY_SPECS:
+            raise ValueError(f"Unknown entity kind: {kind!r}")
+        if self._loading[kind]:
+            self._patches[kind].append((time.time(), patch))
+        collection = self._collections.get(kind)
+        if collection is not None:
+            self._apply(collection, patch)
+
+    @staticmethod
+    def _apply(collection: _Collection, patch: dict) -> None:
+        record = patch.get("record")
+        if isinstance(record, dict):
+            inner = record.get(collection.spec.resource_key)
+            collection.upsert(inner if isinstance(inner, dict) else record)
+        for field, value in (patch.get("deleted") or {}).items():
+            collection.remove(field, value)
@@ -0,0 +1,198 @@
+"""Resumable export of a paginated endpoint to a local CSV or NDJSON file.
+
+Pages are fetched concurrently in windows and appended in page order. After
+every page a checkpoint next to the output file records how many pages and
+bytes are durable, so an interrupted export resumes from there instead of
+starting over.
+
+CSV columns are taken from the first page. Fields that first appear on a
+later page are not dropped: they go, as a JSON object, into a trailing
+``_extra`` column, and the result lists their names.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+PageFetcher = Callable[[int], Awaitable[dict | list]]
+
+FORMATS = ("csv", "ndjson")
+
+# CSV column holding fields missing from the header, as a JSON object.
+EXTRA_COLUMN = "_extra"
+
+# One lock per output file, so two exports never write the same file at once.
+_locks: dict[Path, asyncio.Lock] = {}
+
+
+class ExportInProgress(RuntimeError):
+    """Another export is already writing the same file."""
+
+
+def _page_items(result: dict | list, resource_key: str | None) -> tuple[list[dict], dict]:
+    """Records and pagination info of one page, unwrapping ``{resource_key: {...}}`` items."""
+    if isinstance(result, dict) and "data" in result:
+        items, pagination = result["data"], result.get("pagination", {})
+    elif isinstance(result, list):
+        items, pagination = result, {}
+    else:
+        items, pagination = [], {}
+    records = []
+    for item in items:
+        if isinstance(item, dict) and resource_key and isinstance(item.get(resource_key), dict):
+            item = item[resource_key]
+        if isinstance(item, dict):
+            records.append(item)
+    return records, pagination
+
+
+def _cell(value: object) -> object:
+    return json.dumps(value, separators=(",", ":"), default=str) if isinstance(value, (dict, list)) else value
+
+
+class Export:
+    """One export job writing to ``path``, with its checkpoint at ``path + ".checkpoint"``."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        fetch_page: PageFetcher,
+        fmt: str = "csv",
+        resource_key: str | None = None,
+        concurrency: int = 8,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+        self.path = Path(path).expanduser()
+        self.checkpoint_path = self.path.with_name(self.path.name + ".checkpoint")
+        self._fetch_page = fetch_page
+        self.fmt = fmt
+        self.resource_key = resource_key
+        self.concurrency = max(1, concurrency)
+
+    # -- checkpoint --------------------------------------------------------
+
+    def _load_checkpoint(self) -> dict | None:
+        try:
+            state = json.loads(self.checkpoint_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if state.get("complete") or state.get("format") != self.fmt or not self.path.exists():
+            return None
+        return state
+
+    def _save_checkpoint(self, state: dict) -> None:
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.checkpoint_path)
+
+    # -- writing -----------------------------------------------------------
+
+    def _encode(self, records: list[dict], state: dict) -> bytes:
+        if self.fmt == "ndjson":
+            return "".join(json.dumps(r, separators=(",", ":"), default=str) + "\n" for r in records).encode()
+        columns = state["columns"]
+        known = set(columns)
+        extra_fields = state.setdefault("extra_fields", [])
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=[*columns, EXTRA_COLUMN])
+        for record in records:
+            row = {key: _cell(value) for key, value in record.items() if key in known}
+            extra = {key: value for key, value in record.items() if key not in known}
+            if extra:
+                row[EXTRA_COLUMN] = _cell(extra)
+                extra_fields.extend(key for key in extra if key not in extra_fields)
+            writer.writerow(row)
+        return buffer.getvalue().encode()
+
+    def _append(self, data: bytes, state: dict) -> None:
+        with open(self.path, "r+b") as fh:
+            fh.truncate(state["bytes"])  # drop anything written after the last checkpoint
+            fh.seek(state["bytes"])
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        state["bytes"] += len(data)
+        self._save_checkpoint(state)
+
+    def _start(self, columns: list[str]) -> dict:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = b""
+        if self.fmt == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow([*columns, EXTRA_COLUMN])
+            header = buffer.getvalue().encode()
+        self.path.write_bytes(header)
+        state = {"format": self.fmt, "columns": columns, "pages_done": 0, "count": 0, "bytes": len(header)}
+        self._save_checkpoint(state)
+        return state
+
+    def _sha256(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    # -- run ---------------------------------------------------------------
+
+    async def run(self, restart: bool = False) -> dict:
+        """Export every page (resuming an unfinished run unless ``restart``).
+
+        Raises ExportInProgress if another export is writing the same file.
+        """
+        lock = _locks.setdefault(self.path.resolve(), asyncio.Lock())
+        if lock.locked():
+            raise ExportInProgress(f"An export to {self.path} is already running.")
+        async with lock:
+            return await self._run(restart)
+
+    async def _run(self, restart: bool) -> dict:
+        state = None if restart else await asyncio.to_thread(self._load_checkpoint)
+        resumed_from = state["pages_done"] + 1 if state else None
+        page = state["pages_done"] + 1 if state else 1
+
+        first_records, pagination = _page_items(await self._fetch_page(page), self.resource_key)
+        if state is None:
+            columns = list(dict.fromkeys(key for record in first_records for key in record))
+            state = await asyncio.to_thread(self._start, columns)
+        last = pagination.get("last")
+        pending = {page: (first_records, pagination)}
+
+        while True:
+            records, pagination = pending.pop(page)
+            last = max(last or 0, pagination.get("last") or 0) or None  # the list can grow mid-export
+            data = self._encode(records, state)
+            state.update(pages_done=page, count=state["count"] + len(records))
+            await asyncio.to_thread(self._append, data, state)
+            if "next" not in pagination or not records:
+                break
+            page = pagination["next"]
+            if page not in pending:
+                # Fetch the next window of pages concurrently when the last page is known.
+                stop = min(page + self.concurrency, last + 1) if last else page + 1
+                window = range(page, max(stop, page + 1))  # always includes ``page`` itself
+                fetched = await asyncio.gather(*(self._fetch_page(p) for p in window))
+                pending.update({p: _page_items(r, self.resource_key) for p, r in zip(window, fetched)})
+
+        sha256 = await asyncio.to_thread(self._sha256)
+        await asyncio.to_thread(self._save_checkpoint, {**state, "complete": True, "sha256": sha256})
+        log.info("Export: wrote %d records to %s", state["count"], self.path)
+        result = {"path": str(self.path), "format": self.fmt, "count": state["count"], "sha256": sha256}
+        if resumed_from:
+            result["resumed_from_page"] = resumed_from
+        if state.get("extra_fields"):
+            result["extra_fields"] = state["extra_fields"]
+            log.warning("Export %s: fields not in the CSV header went to %s: %s",
+                        self.path, EXTRA_COLUMN, ", ".join(state["extra_fields"]))
+        return result
@@ -0,0 +1,94 @@
+"""Trigram-based fuzzy name matching for the search_* tools."""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _fold(text: str) -> str:
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of each token, padded so word starts/ends count."""
+    grams: set[str] = set()
+    for token in _fold(text).split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FuzzyIndex(Generic[T]):
+    """Rank items by how well one of their names matches a query.
+
+    Scores are in [0, 1]: exact match 1.0, prefix 0.95, substring 0.9, all
+    query words present (any order) 0.85, otherwise the Dice coefficient of
+    the trigram sets — which tolerates typos and transpositions.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, T]]) -> None:
+        self._names: list[str] = []
+        self._grams: list[set[str]] = []
+        self._items: list[T] = []
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for name, item in entries:
+            if not name:
+                continue
+            idx = len(self._names)
+            grams = trigrams(name)
+            self._names.append(_fold(name))
+            self._grams.append(grams)
+            self._items.append(item)
+            for gram in grams:
+                self._postings[gram].append(idx)
+
+    def _score(self, query: str, query_grams: set[str], idx: int, shared: int) -> float:
+        name = self._names[idx]
+        if name == query:
+            return 1.0
+        if name.startswith(query):
+            return 0.95
+        if query in name:
+            return 0.9
+        name_tokens = name.split()
+        if all(any(tok.startswith(q) for tok in name_tokens) for q in query.split()):
+            return 0.85
+        return 2 * shared / (len(query_grams) + len(self._grams[idx]))
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> list[tuple[float, T]]:
+        """Return up to ``limit`` ``(score, item)`` pairs, best first, deduplicated by item."""
+        folded = _fold(query)
+        query_grams = trigrams(query)
+        if not folded or not query_grams:
+            return []
+
+        shared: dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for idx in self._postings.get(gram, ()):
+                shared[idx] += 1
+        if len(folded) < 3:
+            # Very short queries may sit inside a word without sharing a trigram.
+            for idx, name in enumerate(self._names):
+                if folded in name:
+                    shared.setdefault(idx, 0)
+
+        best: dict[int, tuple[tuple[float, int], int]] = {}
+        for idx, count in shared.items():
+            score = self._score(folded, query_grams, idx, count)
+            if score < min_score:
+                continue
+            key = id(self._items[idx])
+            # Shorter names win ties so "Acme" ranks above "Acme Insurance Group".
+            rank = (score, -len(self._names[idx]))
+            if key not in best or rank > best[key][0]:
+                best[key] = (rank, idx)
+
+        ranked = sorted(best.values(), key=lambda entry: entry[0], reverse=True)
+        return [(round(rank[0], 3), self._items[idx]) for rank, idx in ranked[:limit]]
@@ -0,0 +1,120 @@
+"""Field projection and empty-value stripping for read tool results.
+
+Retreaver records are wide and mostly null; these helpers trim a tool's
+result before it is serialized into the model's context. Results are
+rebuilt rather than edited in place, because they may be shared with the
+response cache or the entity index.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# Fields that mark a dict as an API record rather than an envelope such as
+# {"data": [...], "pagination": {...}}, {"total": n, "targets": [...]} or
+# a {"target": {...}} resource wrapper.
+_IDENTITY_FIELDS = ("id", "uuid")
+
+FieldTree = dict[str, "FieldTree | None"]
+
+
+def parse_fields(fields: list[str]) -> FieldTree:
+    """Turn ``["name", "caller_list.number"]`` into ``{"name": None, "caller_list": {"number": None}}``."""
+    tree: FieldTree = {}
+    for field in fields:
+        node = tree
+        parts = [part for part in field.strip().split(".") if part]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None  # a whole field wins over any sub-selection
+            else:
+                child = node.get(part, {})
+                if child is None:
+                    break
+                node = node.setdefault(part, child)
+    return tree
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def strip_empty(value: Any) -> Any:
+    """Recursively drop dict entries whose value is None, "", [] or {}."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            item = strip_empty(item)
+            if not _is_empty(item):
+                out[key] = item
+        return out
+    if isinstance(value, list):
+        return [strip_empty(item) for item in value]
+    return value
+
+
+def _select(value: Any, tree: FieldTree) -> Any:
+    """Apply ``tree`` to a nested record value (a dict or a list of dicts)."""
+    if isinstance(value, list):
+        return [_select(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: value[key] if sub is None else _select(value[key], sub)
+            for key, sub in tree.items()
+            if key in value
+        }
+    return value
+
+
+def project(value: Any, tree: FieldTree) -> Any:
+    """Keep only the fields in ``tree`` on every record inside ``value``.
+
+    A dict carrying an identity field or any requested field is a record and
+    is projected; any other dict is an envelope whose scalars (totals,
+    pagination) are kept and whose nested dicts/lists are searched for records.
+    """
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if any(key in value for key in (*_IDENTITY_FIELDS, *tree)):
+        return _select(value, tree)
+    return {
+        key: project(item, tree) if isinstance(item, (dict, list)) else item
+        for key, item in value.items()
+    }
+
+
+def shape(value: Any, fields: list[str] | None = None, keep_empty: bool = False) -> Any:
+    """Project ``value`` to ``fields`` (if given), then strip empty values unless ``keep_empty``."""
+    if fields:
+        value = project(value, parse_fields(fields))
+    if not keep_empty:
+        value = strip_empty(value)
+    return value
+
+
+def projectable(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Give a read tool ``fields`` and ``keep_empty`` parameters that shape its result.
+
+    Apply below ``@mcp.tool()`` so the added parameters appear in the tool schema.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, fields: list[str] | None = None, keep_empty: bool = False, **kwargs: Any) -> Any:
+        return shape(await fn(*args, **kwargs), fields, keep_empty)
+
+    signature = inspect.signature(fn, eval_str=True)
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("fields", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=list[str] | None),
+        inspect.Parameter("keep_empty", inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool),
+    ])
+    wrapper.__doc__ = (fn.__doc__ or "").rstrip() + (
+        "\n\n    Null and empty fields are omitted unless keep_empty is true. Pass fields\n"
+        '    (e.g. ["id", "name", "caller_list.number"]) to return only those fields of each record.\n'
+    )
+    return wrapper
@@ -0,0 +1,110 @@
+"""Adaptive token-bucket rate limiting for the Retreaver API."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+# Additive increase per successful request, and the minimum gap between two
+# multiplicative decreases so one burst of 429s only halves the rate once.
+_INCREASE_STEP = 0.05
+_DECREASE_COOLDOWN = 1.0
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate follows AIMD on throttle feedback.
+
+    Every successful response nudges the rate up by a small constant; every
+    429 halves it (at most once per second) and, if the server sent
+    ``Retry-After``, blocks all callers until that moment has passed.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float = 10.0,
+        min_rate: float = 1.0,
+        max_rate: float = 25.0,
+    ) -> None:
+        self.min_rate = max(0.01, min_rate)
+        self.max_rate = max(self.min_rate, max_rate)
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = asyncio.Lock()
+        self.counters: dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "retries": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent, then consume one token."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        waited = time.monotonic() - started
+        self.counters["requests"] += 1
+        if waited > 0.001:
+            self.counters["waits"] += 1
+            self.counters["wait_seconds"] += waited
+
+    def on_success(self) -> None:
+        """Additively raise the rate after a response that was not throttled."""
+        self.rate = min(self.max_rate, self.rate + _INCREASE_STEP)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Halve the rate and honor the server's Retry-After, if any."""
+        now = time.monotonic()
+        self.counters["throttled"] += 1
+        if now - self._last_decrease >= _DECREASE_COOLDOWN:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._last_decrease = now
+        self._tokens = 0.0
+        self._updated = now
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def snapshot(self) -> dict:
+        """Return the current rate and counters."""
+        return {"rate": round(self.rate, 3), **self.counters}
+
+
+_limiters: dict[str, AdaptiveRateLimiter] = {}
+
+
+def limiter_for(api_key: str) -> AdaptiveRateLimiter:
+    """Return the process-wide limiter for ``api_key``, creating it on first use.
+
+    The initial rate, floor, ceiling (requests per second) and bucket size come
+    from ``RETREAVER_RATE_LIMIT``, ``RETREAVER_RATE_LIMIT_MIN``,
+    ``RETREAVER_RATE_LIMIT_MAX`` and ``RETREAVER_RATE_BURST``.
+    """
+    limiter = _limiters.get(api_key)
+    if limiter is None:
+        limiter = _limiters[api_key] = AdaptiveRateLimiter(
+            rate=float(os.environ.get("RETREAVER_RATE_LIMIT", "10")),
+            burst=float(os.environ.get("RETREAVER_RATE_BURST", "10")),
+            min_rate=float(os.environ.get("RETREAVER_RATE_LIMIT_MIN", "1")),
+            max_rate=float(os.environ.get("RETREAVER_RATE_LIMIT_MAX", "25")),
+        )
+    return limiter
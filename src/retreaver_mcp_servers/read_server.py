@@ -2,19 +2,165 @@
 
 from __future__ import annotations
 
+import asyncio
+import hmac
+import logging
+import os
+import re
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
+from .call_flow import calls_in, decode, verdict
+from .call_stats import GROUP_KEYS, flatten, summarize
 from .client import RetreaverClient
+from .entity_index import ENTITY_SPECS, EntityIndex, normalize_phone
+from .exporter import FORMATS as EXPORT_FORMATS, Export, ExportInProgress
+from .process import PID_DIR
+from .projection import projectable, shape
+from .reports import NotMergeable, ReportCache, day_buckets, merge_reports, report_rows, sort_field
+from .result_store import ResultStore
+from .singleflight import SingleFlight
+from .snapshot import EntitySnapshot
+from .warehouse import CallWarehouse, parse_timestamp, to_utc_iso
+
+log = logging.getLogger(__name__)
 
 mcp = FastMCP("retreaver-read")
 client = RetreaverClient()
 
+# Maximum number of pages _fetch_all_pages requests at once once the
+# last page number is known from the Link header.
+PAGE_CONCURRENCY = max(1, int(os.environ.get("RETREAVER_PAGE_CONCURRENCY", "8")))
+
+# get_all_calls fetches its date range as concurrent day shards; a day with
+# more pages than this is fetched as hour shards instead.
+CALL_SHARD_MAX_PAGES = max(1, int(os.environ.get("RETREAVER_CALL_SHARD_MAX_PAGES", "10")))
+
+# Full scrapes already running are joined rather than started again.
+_scrapes = SingleFlight()
+
+
+def _account_file(stem: str) -> str:
+    """Default path of a per-account data file, so different companies never share one."""
+    company = re.sub(r"[^\w.-]", "_", client.company_id)
+    return str(PID_DIR / f"{stem}-{company}.sqlite3")
+
+
+# Resident index of account entities. Restored from the SQLite snapshot at
+# RETREAVER_SNAPSHOT_PATH when the server starts, reloaded every
+# RETREAVER_INDEX_REFRESH_SECONDS, and patched by the write server through
+# the /entity-index route below.
+_snapshot_path = os.environ.get("RETREAVER_SNAPSHOT_PATH", _account_file("entities"))
+entity_index = EntityIndex(
+    lambda path, resource_key: _fetch_all_pages(path, resource_key),
+    refresh_seconds=float(os.environ.get("RETREAVER_INDEX_REFRESH_SECONDS", "300")),
+    snapshot=EntitySnapshot(_snapshot_path) if _snapshot_path else None,
+)
+
+# Oldest index data (seconds) each group of tools accepts before the index is
+# reloaded: fuzzy name search, full get_all_* listings, and single lookups
+# (which fall back to a direct API call instead of a full reload).
+INDEX_MAX_AGE = {
+    "search": float(os.environ.get("RETREAVER_INDEX_MAX_AGE_SEARCH", "3600")),
+    "list": float(os.environ.get("RETREAVER_INDEX_MAX_AGE_LIST", "900")),
+    "lookup": float(os.environ.get("RETREAVER_INDEX_MAX_AGE_LOOKUP", "900")),
+}
+# Index age past which a lookup that finds nothing reloads the kind and retries.
+_MISS_RELOAD_AGE = 60.0
+
+
+# Oversized get_all_* results are kept here behind a handle and returned as
+# a preview; fetch_result / query_result read the rest.
+results = ResultStore(
+    max_entries=int(os.environ.get("RETREAVER_RESULT_STORE_MAX_ENTRIES", "32")),
+    ttl=float(os.environ.get("RETREAVER_RESULT_STORE_TTL", "1800")),
+    max_chars=int(os.environ.get("RETREAVER_RESULT_MAX_CHARS", "40000")),
+    preview_rows=int(os.environ.get("RETREAVER_RESULT_PREVIEW_ROWS", "20")),
+)
+
+# Opt-in: with RETREAVER_REPORT_CACHE_PATH set, closed (past) day buckets of
+# report queries are cached on disk and only the open tail of a range, and
+# buckets not seen before, are fetched live.
+_report_cache_path = os.environ.get("RETREAVER_REPORT_CACHE_PATH", "")
+report_cache = ReportCache(_report_cache_path, client.company_id) if _report_cache_path else None
+REPORT_SETTLE_SECONDS = float(os.environ.get("RETREAVER_REPORT_SETTLE_SECONDS", "3600"))
+REPORT_MAX_BUCKET_FETCHES = int(os.environ.get("RETREAVER_REPORT_MAX_BUCKET_FETCHES", "62"))
+
+# export_numbers writes its files (and resume checkpoints) here.
+EXPORT_DIR = Path(os.environ.get("RETREAVER_EXPORT_DIR", str(PID_DIR / "exports"))).expanduser()
+
+# Optional local calls warehouse, ingested in the background from
+# /api/v3/calls.json and queried by the warehouse tools below.
+warehouse: CallWarehouse | None = None
+if os.environ.get("RETREAVER_WAREHOUSE", "").lower() in ("1", "true", "yes"):
+    warehouse = CallWarehouse(
+        os.environ.get("RETREAVER_WAREHOUSE_PATH", _account_file("calls")),
+        lambda params: client.get("/api/v3/calls.json", params),
+        backfill_days=float(os.environ.get("RETREAVER_WAREHOUSE_BACKFILL_DAYS", "30")),
+    )
+WAREHOUSE_INTERVAL = float(os.environ.get("RETREAVER_WAREHOUSE_INTERVAL", "300"))
+
+
+async def _indexed(kind: str, field: str, value: object, path: str) -> dict:
+    """Answer a single-entity lookup from the index when it is warm and fresh, else from the API."""
+    age = entity_index.age(kind)
+    if age is not None and age <= INDEX_MAX_AGE["lookup"]:
+        record = await entity_index.get(kind, field, value)
+        if record is not None:
+            return {ENTITY_SPECS[kind].resource_key: record}
+    return await client.get(path)
+
+
+# Shared secret the write server sends with index patches (also required for
+# /client-stats). Without one, only loopback addresses are accepted.
+INDEX_TOKEN = os.environ.get("RETREAVER_INDEX_TOKEN", "")
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+
+
+def _request_allowed(request: Request) -> bool:
+    if INDEX_TOKEN:
+        return hmac.compare_digest(request.headers.get("x-retreaver-index-token", ""), INDEX_TOKEN)
+    return request.client is not None and request.client.host in _LOOPBACK_HOSTS
+
+
+@mcp.custom_route("/entity-index", methods=["POST"])
+async def entity_index_patch(request: Request) -> JSONResponse:
+    """Receive create/update/delete notifications from the write server.
+
+    The write went through the write server's own client, so cached GETs for
+    the resource are dropped here too; otherwise they would stay stale, and an
+    index reload could read them and undo the patch.
+    """
+    if not _request_allowed(request):
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+    try:
+        patch = await request.json()
+        entity_index.apply_patch(patch)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    client.invalidate(ENTITY_SPECS[patch["kind"]].path)
+    return JSONResponse({"ok": True})
+
+
+@mcp.custom_route("/client-stats", methods=["GET"])
+async def client_stats(request: Request) -> JSONResponse:
+    """Report the API client's rate limiter, retry, coalescing and cache counters."""
+    if not _request_allowed(request):
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+    return JSONResponse(client.stats())
+
 # ---------------------------------------------------------------------------
 # Calls
 # ---------------------------------------------------------------------------
 
 
 @mcp.tool()
+@projectable
 async def get_calls(
     page: int = 1,
     per_page: int = 25,
@@ -64,59 +210,129 @@ async def get_calls(
 
 
 @mcp.tool()
+@projectable
 async def get_call(uuid: str) -> dict:
     """Get a single call by its UUID."""
     return await client.get(f"/api/v3/calls/{uuid}.json")
 
 
 @mcp.tool()
+@projectable
 async def check_call_flow(
     caller: str | None = None,
     uuid: str | None = None,
-) -> dict | list:
+    raw: bool = False,
+) -> dict:
     """Check what happened during a SINGLE call by looking up its call flow events.
 
-    Only look up ONE call at a time. If you need to check multiple calls, call this
-    tool once per call.
+    Returns whether the call connected and a one-line reason, an outcome
+    (routed target, rejections, caps hit, RTB bids) decoded from the call flow
+    events, and a compact timeline (t = seconds since the first event). Set
+    raw=true only when the user needs the unprocessed events; they are also
+    included automatically when the events could not be decoded.
+
+    Only look up ONE call at a time. To check several calls, use check_call_flows
+    instead of calling this tool repeatedly.
 
     Provide either a caller phone number OR a single call UUID (not both).
 
     Parameters:
-        caller: A single caller phone number to look up.
+        caller: A single caller phone number to look up (all of its calls, newest first).
         uuid: A single call UUID to look up (e.g. "addcf985-017e-4962-be34-cf5d55e74afc").
+        raw: Also return the raw call_flow_events (default false).
     """
     if uuid:
         uuid = uuid.strip()
         if " " in uuid or "," in uuid:
-            return {"error": "Only one UUID at a time. Call this tool once per call."}
-        return await client.get(
+            return {"error": "Only one UUID at a time. Use check_call_flows for several calls."}
+        result = await client.get(
             f"/api/v2/calls/{uuid}.json",
             {"call_flow_events": "true"},
         )
+        calls = calls_in(result)
+        return decode(calls[0], raw) if calls else {"error": "No call found.", "response": result}
     if caller:
         caller = caller.strip()
-        return await client.get(
+        result = await client.get(
             "/api/v2/calls.json",
             {"caller": caller, "call_flow_events": "true"},
         )
+        calls = sorted(calls_in(result), key=lambda call: call.get("created_at") or "", reverse=True)
+        return {"total": len(calls), "calls": [decode(call, raw) for call in calls]}
     return {"error": "Provide either a caller phone number or a call UUID."}
 
 
+_MAX_FLOW_BATCH = 100
+
+
+@mcp.tool()
+async def check_call_flows(
+    uuids: list[str] | None = None,
+    callers: list[str] | None = None,
+) -> dict:
+    """Check whether several calls connected, and why not, in one step.
+
+    Looks up every call concurrently and returns one short verdict per call
+    (connected true/false plus a one-line reason) instead of the full call
+    flow events. For a caller number, the most recent call from that number
+    is checked and other_calls counts the rest. Use check_call_flow on a
+    single call when the user wants the detailed flow.
+
+    Parameters:
+        uuids: Call UUIDs to check (up to 100).
+        callers: Caller phone numbers to check (up to 100).
+    """
+    uuids = list(dict.fromkeys(u.strip() for u in uuids or [] if u and u.strip()))
+    callers = list(dict.fromkeys(c.strip() for c in callers or [] if c and c.strip()))
+    if not uuids and not callers:
+        return {"error": "Provide uuids and/or callers."}
+    if len(uuids) + len(callers) > _MAX_FLOW_BATCH:
+        return {"error": f"At most {_MAX_FLOW_BATCH} calls per request."}
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def check(path: str, params: dict) -> dict:
+        try:
+            async with semaphore:
+                result = await client.get(path, {"call_flow_events": "true", **params})
+        except Exception as exc:
+            return {"error": str(exc)}
+        calls = calls_in(result)
+        if not calls:
+            return {"error": "No call found."}
+        calls.sort(key=lambda call: call.get("created_at") or "", reverse=True)
+        out = verdict(calls[0])
+        if len(calls) > 1:
+            out["other_calls"] = len(calls) - 1
+        return out
+
+    checks = [check(f"/api/v2/calls/{uuid}.json", {}) for uuid in uuids]
+    checks += [check("/api/v2/calls.json", {"caller": caller}) for caller in callers]
+    verdicts = await asyncio.gather(*checks)
+    by_call = dict(zip([*uuids, *callers], verdicts))
+    return {
+        "checked": len(by_call),
+        "connected": sum(1 for v in by_call.values() if v.get("connected")),
+        "calls": by_call,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Affiliates
 # ---------------------------------------------------------------------------
 
 
 @mcp.tool()
+@projectable
 async def get_affiliates(page: int = 1) -> dict | list:
     """List all affiliates (25 per page)."""
     return await client.get("/affiliates.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_affiliate(afid: str) -> dict:
     """Get a single affiliate by AFID."""
-    return await client.get(f"/affiliates/afid/{afid}.json")
+    return await _indexed("affiliates", "afid", afid, f"/affiliates/afid/{afid}.json")
 
 
 # ---------------------------------------------------------------------------
@@ -125,21 +341,24 @@ async def get_affiliate(afid: str) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_targets(page: int = 1) -> dict | list:
     """List all targets (25 per page)."""
     return await client.get("/targets.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_target(target_id: int) -> dict:
     """Get a single target by internal ID."""
-    return await client.get(f"/targets/{target_id}.json")
+    return await _indexed("targets", "id", target_id, f"/targets/{target_id}.json")
 
 
 @mcp.tool()
+@projectable
 async def get_target_by_tid(tid: str) -> dict:
     """Get a single target by customer-editable TID."""
-    return await client.get(f"/targets/tid/{tid}.json")
+    return await _indexed("targets", "tid", tid, f"/targets/tid/{tid}.json")
 
 
 # ---------------------------------------------------------------------------
@@ -148,15 +367,17 @@ async def get_target_by_tid(tid: str) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_campaigns(page: int = 1) -> dict | list:
     """List all campaigns (25 per page)."""
     return await client.get("/campaigns.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_campaign(cid: str) -> dict:
     """Get a single campaign by CID."""
-    return await client.get(f"/campaigns/cid/{cid}.json")
+    return await _indexed("campaigns", "cid", cid, f"/campaigns/cid/{cid}.json")
 
 
 # ---------------------------------------------------------------------------
@@ -165,15 +386,31 @@ async def get_campaign(cid: str) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_numbers(page: int = 1) -> dict | list:
     """List all numbers (25 per page)."""
     return await client.get("/numbers.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_number(number_id: int) -> dict:
     """Get a single number by ID."""
-    return await client.get(f"/numbers/{number_id}.json")
+    return await _indexed("numbers", "id", number_id, f"/numbers/{number_id}.json")
+
+
+@mcp.tool()
+@projectable
+async def get_number_by_phone(phone: str) -> dict:
+    """Find a tracking number by its phone number (any format, e.g. +18668987878 or 866-898-7878)."""
+    record = await entity_index.get("numbers", "number", phone, max_age=INDEX_MAX_AGE["lookup"])
+    if record is None:
+        # The API has no lookup by phone: reload the numbers (at most once a
+        # minute) so a number bought since the last refresh is still found.
+        record = await entity_index.get("numbers", "number", phone, max_age=_MISS_RELOAD_AGE)
+    if record is None:
+        return {"error": f"No number matching {phone!r}."}
+    return {"number": record}
 
 
 # ---------------------------------------------------------------------------
@@ -182,15 +419,17 @@ async def get_number(number_id: int) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_number_pools(page: int = 1) -> dict | list:
     """List all number pools (25 per page)."""
     return await client.get("/number_pools.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_number_pool(pool_id: int) -> dict:
     """Get a single number pool by ID."""
-    return await client.get(f"/number_pools/{pool_id}.json")
+    return await _indexed("number_pools", "id", pool_id, f"/number_pools/{pool_id}.json")
 
 
 # ---------------------------------------------------------------------------
@@ -199,18 +438,21 @@ async def get_number_pool(pool_id: int) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_active_company() -> dict:
     """Get the currently active company."""
     return await client.get("/company.json")
 
 
 @mcp.tool()
+@projectable
 async def get_companies(page: int = 1) -> dict | list:
     """List all companies (25 per page)."""
     return await client.get("/companies.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_company(company_id: int) -> dict:
     """Get a single company by ID."""
     return await client.get(f"/companies/{company_id}.json")
@@ -222,18 +464,21 @@ async def get_company(company_id: int) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_contacts(page: int = 1) -> dict | list:
     """List all contacts (25 per page)."""
     return await client.get("/contacts.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_contact(contact_id: int) -> dict:
     """Get a single contact by ID."""
     return await client.get(f"/contacts/{contact_id}.json")
 
 
 @mcp.tool()
+@projectable
 async def get_contact_by_phone(phone: str) -> dict:
     """Get a contact by phone number (E.164 format, e.g. +15551234567)."""
     return await client.get(f"/contacts/phone/{phone}.json")
@@ -245,6 +490,7 @@ async def get_contact_by_phone(phone: str) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_caller_list(target_id: int, caller_list_name: str) -> dict:
     """Get a single caller list by name.
 
@@ -256,6 +502,7 @@ async def get_caller_list(target_id: int, caller_list_name: str) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_caller_list_numbers(target_id: int, caller_list_name: str, page: int = 1) -> dict | list:
     """List phone numbers in a caller list (25 per page).
 
@@ -276,12 +523,14 @@ async def get_caller_list_numbers(target_id: int, caller_list_name: str, page: i
 
 
 @mcp.tool()
+@projectable
 async def get_suppressed_numbers(page: int = 1) -> dict | list:
     """List all suppressed numbers (25 per page)."""
     return await client.get("/suppressed_numbers.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_suppressed_number(suppressed_number_id: int) -> dict:
     """Get a single suppressed number by ID."""
     return await client.get(f"/suppressed_numbers/{suppressed_number_id}.json")
@@ -293,26 +542,197 @@ async def get_suppressed_number(suppressed_number_id: int) -> dict:
 
 
 @mcp.tool()
+@projectable
 async def get_static_caller_numbers(page: int = 1) -> dict | list:
     """List all static caller numbers (25 per page)."""
     return await client.get("/static_caller_numbers.json", {"page": page})
 
 
+# ---------------------------------------------------------------------------
+# Bulk export
+# ---------------------------------------------------------------------------
+
+_EXPORT_SOURCES = {
+    "caller_list": ("caller_list_number", None),
+    "suppressed_numbers": ("suppressed_number", "/suppressed_numbers.json"),
+    "static_caller_numbers": ("static_caller_number", "/static_caller_numbers.json"),
+}
+
+
+@mcp.tool()
+async def export_numbers(
+    source: str,
+    target_id: int | None = None,
+    caller_list_name: str | None = None,
+    format: str = "csv",
+    restart: bool = False,
+) -> dict:
+    """Export every number of a caller list, the suppressed numbers or the static caller numbers to a local file.
+
+    Use this instead of paging through get_caller_list_numbers,
+    get_suppressed_numbers or get_static_caller_numbers when the whole list
+    is needed. The numbers are written to disk, not returned: the result is
+    only the file path, the record count and a sha256 checksum. An export
+    that was interrupted resumes where it stopped unless restart is true.
+    In CSV files, fields missing from the header are kept as JSON in the
+    last column (listed in extra_fields).
+
+    Parameters:
+        source: "caller_list", "suppressed_numbers" or "static_caller_numbers".
+        target_id: Target ID the caller list belongs to (caller_list only).
+        caller_list_name: Name of the caller list (caller_list only).
+        format: "csv" (default) or "ndjson".
+        restart: Discard any unfinished export of the same list and start over.
+    """
+    if source not in _EXPORT_SOURCES:
+        return {"error": f"source must be one of: {', '.join(_EXPORT_SOURCES)}"}
+    if format not in EXPORT_FORMATS:
+        return {"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}
+    resource_key, path = _EXPORT_SOURCES[source]
+    name = source
+    if source == "caller_list":
+        if target_id is None or not caller_list_name:
+            return {"error": "caller_list exports need target_id and caller_list_name."}
+        path = f"/api/v2/targets/{target_id}/caller_lists/{caller_list_name}/caller_list_numbers.json"
+        name = f"caller_list-{target_id}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', caller_list_name)}"
+
+    export = Export(
+        EXPORT_DIR / f"{name}.{format}",
+        lambda page: client.get(path, {"page": page}),
+        fmt=format,
+        resource_key=resource_key,
+        concurrency=PAGE_CONCURRENCY,
+    )
+    try:
+        return await export.run(restart=restart)
+    except ExportInProgress as exc:
+        return {"error": str(exc)}
+
+
 # ---------------------------------------------------------------------------
 # Target Groups
 # ---------------------------------------------------------------------------
 
 
 @mcp.tool()
+@projectable
 async def get_target_groups(page: int = 1) -> dict | list:
     """List all target groups (25 per page)."""
     return await client.get("/target_groups.json", {"page": page})
 
 
 @mcp.tool()
+@projectable
 async def get_target_group(target_group_id: int) -> dict:
     """Get a single target group by ID."""
-    return await client.get(f"/target_groups/{target_group_id}.json")
+    return await _indexed("target_groups", "id", target_group_id, f"/target_groups/{target_group_id}.json")
+
+
+# ---------------------------------------------------------------------------
+# Batch lookups
+# ---------------------------------------------------------------------------
+
+_MAX_BATCH_IDS = 100
+
+
+async def _get_many(
+    ids: list,
+    resource_key: str,
+    path_for: Callable[[object], str],
+    kind: str | None = None,
+    field: str = "id",
+) -> dict:
+    """Look up many records at once: from the entity index when fresh, else concurrently from the API.
+
+    Returns ``{"found": n, "records": {id: record | {"error": ...}}}``.
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > _MAX_BATCH_IDS:
+        return {"error": f"At most {_MAX_BATCH_IDS} ids per request."}
+    records: dict[str, dict] = {}
+    missing = ids
+    if kind is not None:
+        age = entity_index.age(kind)
+        if age is not None and age <= INDEX_MAX_AGE["lookup"]:
+            missing = []
+            for value in ids:
+                record = await entity_index.get(kind, field, value)
+                if record is None:
+                    missing.append(value)
+                else:
+                    records[str(value)] = record
+
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def fetch(value: object) -> dict:
+        try:
+            async with semaphore:
+                result = await client.get(path_for(value))
+        except Exception as exc:
+            return {"error": str(exc)}
+        inner = result.get(resource_key) if isinstance(result, dict) else None
+        return inner if isinstance(inner, dict) else result
+
+    for value, record in zip(missing, await asyncio.gather(*(fetch(value) for value in missing))):
+        records[str(value)] = record
+    ordered = {str(value): records[str(value)] for value in ids}
+    found = sum(1 for record in ordered.values() if not (isinstance(record, dict) and "error" in record))
+    return {"found": found, "records": ordered}
+
+
+@mcp.tool()
+@projectable
+async def get_targets_by_ids(target_ids: list[int]) -> dict:
+    """Get several targets by internal ID in one call (up to 100).
+
+    Returns {"found": n, "records": {id: target}}; ids that could not be
+    fetched map to {"error": ...}.
+    """
+    return await _get_many(target_ids, "target", lambda i: f"/targets/{i}.json", "targets")
+
+
+@mcp.tool()
+@projectable
+async def get_campaigns_by_cids(cids: list[str]) -> dict:
+    """Get several campaigns by CID in one call (up to 100).
+
+    Returns {"found": n, "records": {cid: campaign}}; CIDs that could not be
+    fetched map to {"error": ...}.
+    """
+    return await _get_many(cids, "campaign", lambda cid: f"/campaigns/cid/{cid}.json", "campaigns", "cid")
+
+
+@mcp.tool()
+@projectable
+async def get_numbers_by_ids(number_ids: list[int]) -> dict:
+    """Get several numbers by ID in one call (up to 100).
+
+    Returns {"found": n, "records": {id: number}}; ids that could not be
+    fetched map to {"error": ...}.
+    """
+    return await _get_many(number_ids, "number", lambda i: f"/numbers/{i}.json", "numbers")
+
+
+@mcp.tool()
+@projectable
+async def get_number_pools_by_ids(pool_ids: list[int]) -> dict:
+    """Get several number pools by ID in one call (up to 100).
+
+    Returns {"found": n, "records": {id: number_pool}}; ids that could not be
+    fetched map to {"error": ...}.
+    """
+    return await _get_many(pool_ids, "number_pool", lambda i: f"/number_pools/{i}.json", "number_pools")
+
+
+@mcp.tool()
+@projectable
+async def get_contacts_by_ids(contact_ids: list[int]) -> dict:
+    """Get several contacts by ID in one call (up to 100).
+
+    Returns {"found": n, "records": {id: contact}}; ids that could not be
+    fetched map to {"error": ...}.
+    """
+    return await _get_many(contact_ids, "contact", lambda i: f"/contacts/{i}.json")
 
 
 # ---------------------------------------------------------------------------
@@ -320,6 +740,16 @@ async def get_target_group(target_group_id: int) -> dict:
 # ---------------------------------------------------------------------------
 
 
+def _unwrap_items(items: list, resource_key: str | None) -> list:
+    """Strip the per-item resource wrapper (e.g. {"target": {...}}) if requested.
+
+    Always returns a new list: ``items`` may be a cached or shared response.
+    """
+    if resource_key:
+        return [item[resource_key] for item in items if resource_key in item]
+    return list(items)
+
+
 async def _fetch_all_pages(
     path: str,
     resource_key: str | None = None,
@@ -327,123 +757,290 @@ async def _fetch_all_pages(
 ) -> list:
     """Fetch every page for a paginated endpoint, returning all records.
 
+    Page 1 is fetched first. If its Link header advertises a ``last`` page,
+    pages 2..last are requested concurrently (bounded by
+    ``RETREAVER_PAGE_CONCURRENCY``) and reassembled in page order. Otherwise
+    the pages are walked one by one following ``next``.
+
+    Concurrent calls with the same arguments share one scrape and one result
+    list, which callers must treat as read-only.
+
     Args:
         path: API endpoint path (e.g. "/targets.json").
         resource_key: If the API wraps each item in a key (e.g. "target"),
             unwrap it so callers get flat dicts with fields like "name".
         extra_params: Additional query parameters to include on every request.
     """
+    key = (path, resource_key, tuple(sorted((k, str(v)) for k, v in (extra_params or {}).items())))
+    return await _scrapes.do(key, lambda: _scrape_all_pages(path, resource_key, extra_params))
+
+
+async def _scrape_all_pages(
+    path: str,
+    resource_key: str | None,
+    extra_params: dict | None,
+    first: dict | list | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> list:
+    """Scrape every page (see ``_fetch_all_pages``), starting from ``first`` if already fetched.
+
+    Pages 2..last are fetched under ``semaphore``; pass one shared semaphore
+    when running several scrapes at once so they respect a single bound.
+    """
+    if first is None:
+        first = await client.get(path, {"page": 1, **(extra_params or {})})
+    if isinstance(first, list):
+        return _unwrap_items(first, resource_key)  # no pagination info means single page
+    if not (isinstance(first, dict) and "data" in first):
+        return []
+
+    all_items = _unwrap_items(first["data"], resource_key)
+    pagination = first.get("pagination", {})
+    if "next" not in pagination:
+        return all_items
+
+    last = pagination.get("last")
+    if last is None:
+        return all_items + await _walk_pages(path, resource_key, extra_params, pagination["next"])
+
+    semaphore = semaphore or asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def fetch_page(page: int) -> list:
+        async with semaphore:
+            result = await client.get(path, {"page": page, **(extra_params or {})})
+        if isinstance(result, dict) and "data" in result:
+            return _unwrap_items(result["data"], resource_key)
+        if isinstance(result, list):
+            return _unwrap_items(result, resource_key)
+        return []
+
+    pages = await asyncio.gather(*(fetch_page(page) for page in range(2, last + 1)))
+    for items in pages:
+        all_items.extend(items)
+    return all_items
+
+
+async def _walk_pages(
+    path: str,
+    resource_key: str | None,
+    extra_params: dict | None,
+    page: int,
+) -> list:
+    """Sequentially follow ``next`` links starting at ``page``."""
     all_items: list = []
-    page = 1
     while True:
         params: dict = {"page": page, **(extra_params or {})}
         result = await client.get(path, params)
         if isinstance(result, dict) and "data" in result:
-            items = result["data"]
-            if resource_key:
-                items = [item[resource_key] for item in items if resource_key in item]
-            all_items.extend(items)
+            all_items.extend(_unwrap_items(result["data"], resource_key))
             if "next" not in result.get("pagination", {}):
                 break
             page = result["pagination"]["next"]
         elif isinstance(result, list):
-            items = result
-            if resource_key:
-                items = [item[resource_key] for item in items if resource_key in item]
-            all_items.extend(items)
+            all_items.extend(_unwrap_items(result, resource_key))
             break  # no pagination info means single page
         else:
             break
     return all_items
 
 
+async def _ranked_search(kind: str, text: str, limit: int) -> list:
+    """Fuzzy search the entity index, tagging each record with its match_score."""
+    results = await entity_index.search(kind, text, limit, max_age=INDEX_MAX_AGE["search"])
+    return [{**record, "match_score": score} for score, record in results]
+
+
 @mcp.tool()
-async def search_targets(name: str) -> list:
+@projectable
+async def search_targets(name: str, limit: int = 25) -> list:
     """Search all targets by name. Use this instead of paging through get_targets manually.
 
+    Matching is typo-tolerant: results are ranked best first, with exact, prefix
+    and substring matches ahead of fuzzy ones. Each result has a match_score
+    from 0 to 1.
+
     Parameters:
-        name: Case-insensitive substring to match against the target name.
+        name: Target name or part of it (misspellings are OK).
+        limit: Maximum number of results (default 25).
     """
-    all_targets = await _fetch_all_pages("/targets.json", "target")
-    needle = name.lower()
-    return [t for t in all_targets if needle in (t.get("name") or "").lower()]
+    return await _ranked_search("targets", name, limit)
 
 
 @mcp.tool()
-async def search_campaigns(name: str) -> list:
+@projectable
+async def search_campaigns(name: str, limit: int = 25) -> list:
     """Search all campaigns by name. Use this instead of paging through get_campaigns manually.
 
+    Matching is typo-tolerant: results are ranked best first, with exact, prefix
+    and substring matches ahead of fuzzy ones. Each result has a match_score
+    from 0 to 1.
+
     Parameters:
-        name: Case-insensitive substring to match against the campaign name.
+        name: Campaign name or part of it (misspellings are OK).
+        limit: Maximum number of results (default 25).
     """
-    all_campaigns = await _fetch_all_pages("/campaigns.json", "campaign")
-    needle = name.lower()
-    return [c for c in all_campaigns if needle in (c.get("name") or "").lower()]
+    return await _ranked_search("campaigns", name, limit)
 
 
 @mcp.tool()
-async def search_affiliates(search: str) -> list:
+@projectable
+async def search_affiliates(search: str, limit: int = 25) -> list:
     """Search all affiliates by name. Use this instead of paging through get_affiliates manually.
 
-    Matches against company_name or first_name (case-insensitive).
+    Matches against company_name or first_name. Matching is typo-tolerant:
+    results are ranked best first with a match_score from 0 to 1.
+
+    Parameters:
+        search: Company or first name, or part of it (misspellings are OK).
+        limit: Maximum number of results (default 25).
+    """
+    return await _ranked_search("affiliates", search, limit)
+
+
+# resolve_ids kind prefixes, including the jargon from the agent guide.
+_RESOLVE_KINDS = {
+    "campaign": "campaigns",
+    "target": "targets",
+    "buyer": "targets",
+    "affiliate": "affiliates",
+    "publisher": "affiliates",
+    "pub": "affiliates",
+    "source": "affiliates",
+    "number": "numbers",
+    "did": "numbers",
+}
+_RESOLVE_DEFAULT_KINDS = ("campaigns", "targets", "affiliates", "numbers")
+
+
+def _id_card(kind: str, record: dict, score: float) -> dict:
+    """The identifying fields of ``record``, for resolve_ids output."""
+    spec = ENTITY_SPECS[kind]
+    card = {"kind": kind[:-1]}
+    for field in (*spec.keys, *spec.names, *spec.phone_keys):
+        if record.get(field) not in (None, ""):
+            card[field] = record[field]
+    card["score"] = score
+    return card
+
+
+async def _resolve_one(query: str, kinds: tuple[str, ...]) -> dict:
+    text = query.strip()
+    prefix, sep, rest = text.partition(":")
+    if sep and prefix.strip().lower() in _RESOLVE_KINDS:
+        kinds, text = (_RESOLVE_KINDS[prefix.strip().lower()],), rest.strip()
+
+    matches: list[tuple[float, str, dict]] = []
+    if len(normalize_phone(text)) >= 10:
+        for kind in kinds:
+            for field in ENTITY_SPECS[kind].phone_keys:
+                record = await entity_index.get(kind, field, text, max_age=INDEX_MAX_AGE["search"])
+                if record is not None:
+                    matches.append((1.0, kind, record))
+    if not matches:
+        searches = await asyncio.gather(*(
+            entity_index.search(kind, text, limit=5, max_age=INDEX_MAX_AGE["search"])
+            for kind in kinds if ENTITY_SPECS[kind].names
+        ))
+        named = [kind for kind in kinds if ENTITY_SPECS[kind].names]
+        matches = [(score, kind, record) for kind, found in zip(named, searches) for score, record in found]
+    matches.sort(key=lambda match: match[0], reverse=True)
+
+    if not matches:
+        return {"query": query, "error": "No match."}
+    best, second = matches[0], matches[1] if len(matches) > 1 else None
+    # Unambiguous: a clear exact/prefix/substring hit that nothing else ties.
+    # Those tiers are 0.05 apart; the tolerance absorbs float error (0.95 - 0.9 < 0.05).
+    if best[0] >= 0.9 and (second is None or best[0] - second[0] >= 0.05 - 1e-9):
+        return {"query": query, "match": _id_card(best[1], best[2], best[0])}
+    return {
+        "query": query,
+        "ambiguous": True,
+        "candidates": [_id_card(kind, record, score) for score, kind, record in matches[:5]],
+    }
+
+
+@mcp.tool()
+async def resolve_ids(names: list[str], kinds: list[str] | None = None) -> dict:
+    """Resolve campaign, target, affiliate and number names to their IDs in one call.
+
+    Answers from the resident entity index. Each name comes back with a
+    single match (kind, id, cid/tid/afid, name, score), or with
+    ambiguous=true and up to 5 candidates to choose from or ask the user
+    about. A name can be pinned to a kind with a prefix such as
+    "campaign:Auto Insurance", "buyer:Acme" or "publisher:Smith Media";
+    phone numbers are matched against tracking numbers and target numbers.
 
     Parameters:
-        search: Case-insensitive substring to match against company_name or first_name.
+        names: Names or phone numbers to resolve, of any mix of kinds.
+        kinds: Kinds to search when a name has no prefix (default: campaign,
+            target, affiliate, number).
     """
-    all_affiliates = await _fetch_all_pages("/affiliates.json", "affiliate")
-    needle = search.lower()
-    return [
-        a for a in all_affiliates
-        if needle in (a.get("company_name") or "").lower()
-        or needle in (a.get("first_name") or "").lower()
-    ]
+    if kinds:
+        unknown = [kind for kind in kinds if kind.lower().rstrip("s") not in _RESOLVE_KINDS]
+        if unknown:
+            return {"error": f"Unknown kinds {unknown}; use campaign, target, affiliate or number."}
+        search_kinds = tuple(dict.fromkeys(_RESOLVE_KINDS[kind.lower().rstrip("s")] for kind in kinds))
+    else:
+        search_kinds = _RESOLVE_DEFAULT_KINDS
+    resolved = await asyncio.gather(*(_resolve_one(name, search_kinds) for name in names))
+    return {"results": list(resolved)}
 
 
 @mcp.tool()
+@results.offloading("numbers")
+@projectable
 async def get_all_numbers() -> dict:
     """Fetch ALL numbers across every page and return them with a total count.
 
     Use this instead of paging through get_numbers manually. Returns
     {"total": <int>, "numbers": [...]}.
     """
-    numbers = await _fetch_all_pages("/numbers.json", "number")
+    numbers = await entity_index.records("numbers", max_age=INDEX_MAX_AGE["list"])
     return {"total": len(numbers), "numbers": numbers}
 
 
 @mcp.tool()
+@results.offloading("targets")
+@projectable
 async def get_all_targets() -> dict:
     """Fetch ALL targets across every page and return them with a total count.
 
     Use this instead of paging through get_targets manually. Returns
     {"total": <int>, "targets": [...]}.
     """
-    targets = await _fetch_all_pages("/targets.json", "target")
+    targets = await entity_index.records("targets", max_age=INDEX_MAX_AGE["list"])
     return {"total": len(targets), "targets": targets}
 
 
 @mcp.tool()
+@results.offloading("campaigns")
+@projectable
 async def get_all_campaigns() -> dict:
     """Fetch ALL campaigns across every page and return them with a total count.
 
     Use this instead of paging through get_campaigns manually. Returns
     {"total": <int>, "campaigns": [...]}.
     """
-    campaigns = await _fetch_all_pages("/campaigns.json", "campaign")
+    campaigns = await entity_index.records("campaigns", max_age=INDEX_MAX_AGE["list"])
     return {"total": len(campaigns), "campaigns": campaigns}
 
 
 @mcp.tool()
+@results.offloading("affiliates")
+@projectable
 async def get_all_affiliates() -> dict:
     """Fetch ALL affiliates/publishers across every page and return them with a total count.
 
     Use this instead of paging through get_affiliates manually. Returns
     {"total": <int>, "affiliates": [...]}.
     """
-    affiliates = await _fetch_all_pages("/affiliates.json", "affiliate")
+    affiliates = await entity_index.records("affiliates", max_age=INDEX_MAX_AGE["list"])
     return {"total": len(affiliates), "affiliates": affiliates}
 
 
 @mcp.tool()
+@results.offloading("calls")
+@projectable
 async def get_all_calls(
     created_at_start: str | None = None,
     created_at_end: str | None = None,
@@ -462,16 +1059,372 @@ async def get_all_calls(
         extra["created_at_start"] = created_at_start
     if created_at_end is not None:
         extra["created_at_end"] = created_at_end
-    calls = await _fetch_all_pages("/api/v3/calls.json", extra_params=extra)
+    if created_at_start is None:
+        calls = await _fetch_all_pages("/api/v3/calls.json", extra_params=extra)
+    else:
+        calls = await _fetch_calls_sharded(extra)
     return {"total": len(calls), "calls": calls}
 
 
+def _has_offset(value: str) -> bool:
+    """Whether an ISO-8601 timestamp carries a UTC offset (or ``Z``)."""
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00").replace(" ", "T", 1)).tzinfo is not None
+    except ValueError:
+        return False
+
+
+async def _fetch_calls_sharded(params: dict) -> list:
+    """Fetch every call between params' created_at_start and created_at_end (default now).
+
+    The range is cut into day shards that are scraped concurrently. A shard
+    whose first page shows more than ``CALL_SHARD_MAX_PAGES`` pages is split
+    into hours first. Shard boundaries may overlap, so calls are de-duplicated
+    by UUID (keeping the latest ``updated_at``) and returned oldest first, in
+    the same wrapped shape as the API.
+
+    The caller's own start and end strings are sent unchanged on the outer
+    shards. Inner boundaries carry an offset only if the start had one, so a
+    range in the account's local time stays in local time. Every request of
+    the fetch, across all shards, shares one ``PAGE_CONCURRENCY`` bound.
+    """
+    start_text = params["created_at_start"]
+    end_text = params.get("created_at_end")
+    with_offset = _has_offset(start_text)
+    start = parse_timestamp(start_text)  # naive times are read as UTC, i.e. on their own wall clock
+    end = parse_timestamp(end_text) if end_text else datetime.now(timezone.utc)
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    def text(moment: datetime) -> str:
+        return (moment if with_offset else moment.replace(tzinfo=None)).isoformat(timespec="seconds")
+
+    async def shard(lo: datetime, hi: datetime, step: timedelta) -> list:
+        shard_params = {**params, "created_at_start": start_text if lo == start else text(lo)}
+        shard_params.pop("created_at_end", None)
+        if hi != end:
+            shard_params["created_at_end"] = text(hi)
+        elif end_text:
+            shard_params["created_at_end"] = end_text  # without an end, the last shard stays open-ended
+        async with semaphore:
+            first = await client.get("/api/v3/calls.json", {"page": 1, **shard_params})
+        last = first.get("pagination", {}).get("last") if isinstance(first, dict) else None
+        if step > timedelta(hours=1) and last is not None and last > CALL_SHARD_MAX_PAGES:
+            return await split(lo, hi, timedelta(hours=1))
+        return await _scrape_all_pages("/api/v3/calls.json", None, shard_params, first, semaphore)
+
+    async def split(lo: datetime, hi: datetime, step: timedelta) -> list:
+        bounds = []
+        while lo < hi:
+            bounds.append((lo, min(lo + step, hi)))
+            lo += step
+        shards = await asyncio.gather(*(shard(a, b, step) for a, b in bounds))
+        return [item for items in shards for item in items]
+
+    latest: dict[str, tuple[str, dict]] = {}
+    for item in await split(start, end, timedelta(days=1)):
+        call = item.get("call", item) if isinstance(item, dict) else None
+        if not isinstance(call, dict) or not call.get("uuid"):
+            continue
+        updated = to_utc_iso(call.get("updated_at")) or ""
+        seen = latest.get(call["uuid"])
+        if seen is None or updated > seen[0]:
+            latest[call["uuid"]] = (updated, item)
+    items = [item for _, item in latest.values()]
+    items.sort(key=lambda item: to_utc_iso(item.get("call", item).get("created_at")) or "")
+    return items
+
+
+# ---------------------------------------------------------------------------
+# Result handles
+# ---------------------------------------------------------------------------
+
+_MAX_PAGE_ROWS = 200
+
+
+def _expired(handle: str) -> dict:
+    return {"error": f"Unknown or expired result handle {handle!r}. Re-run the original tool."}
+
+
+@mcp.tool()
+async def fetch_result(
+    handle: str,
+    offset: int = 0,
+    limit: int = 50,
+    fields: list[str] | None = None,
+) -> dict:
+    """Page through rows of a large result that was returned as a handle.
+
+    Parameters:
+        handle: The handle from the original tool result (e.g. "res_1a2b3c4d5e6f").
+        offset: Index of the first row to return (default 0).
+        limit: Number of rows to return (default 50, max 200).
+        fields: Optional list of fields to keep on each row, e.g. ["uuid", "caller", "revenue"].
+    """
+    stored = results.get(handle)
+    if stored is None:
+        return _expired(handle)
+    limit = max(1, min(limit, _MAX_PAGE_ROWS))
+    rows = stored.rows[offset:offset + limit]
+    page = {"handle": handle, "rows_total": len(stored.rows), "offset": offset, "rows": shape(rows, fields)}
+    if offset + limit < len(stored.rows):
+        page["next_offset"] = offset + limit
+    return page
+
+
+@mcp.tool()
+async def query_result(
+    handle: str,
+    filter: dict | None = None,
+    offset: int = 0,
+    limit: int = 50,
+    fields: list[str] | None = None,
+) -> dict:
+    """Filter the rows of a large result that was returned as a handle.
+
+    Each filter entry maps a field (dotted for nested fields, e.g.
+    "caller_list.number") to a value for equality, a list of allowed values, or
+    an operator object such as {">": 10} ("=", "!=", ">", ">=", "<", "<=", "in",
+    "contains"). All entries must match. Wrapped rows such as {"call": {...}}
+    are matched on their inner fields.
+
+    Parameters:
+        handle: The handle from the original tool result.
+        filter: Conditions, e.g. {"status": "finished", "connected": false, "revenue": {">": 5}}.
+        offset: Index of the first matching row to return (default 0).
+        limit: Number of matching rows to return (default 50, max 200).
+        fields: Optional list of fields to keep on each row.
+    """
+    stored = results.get(handle)
+    if stored is None:
+        return _expired(handle)
+    try:
+        matched = ResultStore.query(stored.rows, filter)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    limit = max(1, min(limit, _MAX_PAGE_ROWS))
+    page = {
+        "handle": handle,
+        "matched": len(matched),
+        "offset": offset,
+        "rows": shape(matched[offset:offset + limit], fields),
+    }
+    if offset + limit < len(matched):
+        page["next_offset"] = offset + limit
+    return page
+
+
+# ---------------------------------------------------------------------------
+# Calls warehouse
+# ---------------------------------------------------------------------------
+
+_WAREHOUSE_DISABLED = {"error": "The calls warehouse is not enabled (set RETREAVER_WAREHOUSE=1). Use get_all_calls instead."}
+
+
+@mcp.tool()
+async def get_call_warehouse_status() -> dict:
+    """Show what the local calls warehouse covers: row count, complete-from date, newest call, last sync.
+
+    Check this before using summarize_calls with source="warehouse" for a date range.
+    """
+    if warehouse is None:
+        return _WAREHOUSE_DISABLED
+    return await warehouse.status()
+
+
+async def _warehouse_covers(created_at_start: str | None) -> dict | None:
+    """Return the warehouse status if it holds every call from ``created_at_start`` on, else None."""
+    if warehouse is None or not created_at_start:
+        return None
+    coverage = await warehouse.status()
+    floor = coverage["covers_from"]
+    if coverage["run_in_progress"] or not coverage["last_run_at"] or floor is None:
+        return None
+    return coverage if to_utc_iso(created_at_start) >= floor else None
+
+
+@mcp.tool()
+async def summarize_calls(
+    created_at_start: str,
+    created_at_end: str | None = None,
+    group_by: list[str] | None = None,
+    client_cid: str | None = None,
+    client_tid: str | None = None,
+    client_afid: str | None = None,
+    sub_id: str | None = None,
+    status: str | None = None,
+    connected: bool | None = None,
+    converted: bool | None = None,
+    limit: int = 50,
+    source: str = "auto",
+) -> dict:
+    """Aggregate calls into a compact table instead of returning every call.
+
+    Prefer this over get_all_calls for any counting, revenue, payout or duration
+    question. One row per group with calls, connected, converted,
+    conversion_rate, revenue, payout, profit and total_duration avg/p50/p90/max
+    (seconds), sorted by call count, plus overall totals.
+
+    Parameters:
+        created_at_start: ISO-8601 start (inclusive). Required to keep the scan bounded.
+        created_at_end: ISO-8601 end (exclusive).
+        group_by: Zero or more of campaign, target, affiliate, sub_id, status,
+            connected, converted, day, hour (day/hour in UTC), e.g. ["campaign", "day"].
+            The connected/converted group columns are named group_connected/group_converted.
+        client_cid: Filter by campaign CID.
+        client_tid: Filter by target TID.
+        client_afid: Filter by affiliate AFID.
+        sub_id: Filter by sub ID.
+        status: Filter by call status (e.g. "finished").
+        connected: Only connected (true) or unconnected (false) calls.
+        converted: Only converted (true) or unconverted (false) calls.
+        limit: Maximum groups returned (default 50); the rest are counted in truncated_groups.
+        source: "auto" (local warehouse when it covers the range, else the API), "warehouse" or "api".
+    """
+    group_by = list(group_by or [])
+    unknown = [key for key in group_by if key not in GROUP_KEYS]
+    if unknown:
+        return {"error": f"Unknown group_by {unknown}; use any of: {', '.join(GROUP_KEYS)}"}
+    if source not in ("auto", "warehouse", "api"):
+        return {"error": 'source must be "auto", "warehouse" or "api"'}
+    filters = {
+        "created_at_start": created_at_start,
+        "created_at_end": created_at_end,
+        "cid": client_cid,
+        "tid": client_tid,
+        "afid": client_afid,
+        "sub_id": sub_id,
+        "status": status,
+        "connected": connected,
+        "converted": converted,
+    }
+
+    coverage = None
+    if source == "warehouse":
+        if warehouse is None:
+            return _WAREHOUSE_DISABLED
+        coverage = await warehouse.status()
+    elif source == "auto":
+        coverage = await _warehouse_covers(created_at_start)
+
+    if coverage is not None:
+        rows = await warehouse.rows(filters)
+        result = summarize(rows, group_by, limit=limit)
+        return {"source": "warehouse", **result, "coverage": coverage}
+
+    params: dict = {"per_page": 100, "created_at_start": created_at_start}
+    for key, value in (
+        ("created_at_end", created_at_end),
+        ("client_cid", client_cid),
+        ("client_tid", client_tid),
+        ("client_afid", client_afid),
+        ("sub_id", sub_id),
+    ):
+        if value is not None:
+            params[key] = value
+    calls = await _fetch_calls_sharded(params)
+    rows = (flatten(call) for call in calls)
+    # The API only filters by the client_* IDs and sub ID; apply the rest here.
+    local = {k: filters[k] for k in ("status", "connected", "converted") if filters[k] is not None}
+    if local:
+        rows = (
+            row for row in rows
+            if all(
+                (bool(row[k]) == v) if isinstance(v, bool) else row[k] == v
+                for k, v in local.items()
+            )
+        )
+    return {"source": "api", **summarize(rows, group_by, limit=limit)}
+
+
 # ---------------------------------------------------------------------------
 # Reports
 # ---------------------------------------------------------------------------
 
 
+async def _report(
+    path: str,
+    params: dict,
+    created_at_start: str | None,
+    created_at_end: str | None,
+) -> dict | list:
+    """Fetch a report, serving its closed day buckets from the report cache.
+
+    Only buckets that are missing from the cache, plus the still-open tail of
+    the range, are requested (concurrently); everything is then merged. Falls
+    back to a single live request when there is nothing cacheable, too many
+    buckets are missing, or the bucket responses cannot be merged.
+
+    Buckets are cached only when the range carries explicit UTC offsets:
+    timestamps without one are read by the API in the account's timezone,
+    which is unknown here, so it cannot tell when such a day has closed.
+
+    Each bucket except the last ends one second before the next begins, so a
+    call exactly at midnight is counted once whether or not the API treats
+    ``created_at_end`` as inclusive. Calls in the final fraction of a second
+    of a day (``created_at`` has milliseconds) can fall between buckets.
+    """
+    live = {**params}
+    if created_at_start is not None:
+        live["created_at_start"] = created_at_start
+    if created_at_end is not None:
+        live["created_at_end"] = created_at_end
+    if (
+        report_cache is None
+        or created_at_start is None
+        or not _has_offset(created_at_start)
+        or (created_at_end is not None and not _has_offset(created_at_end))
+    ):
+        return await client.get(path, live)
+
+    start = parse_timestamp(created_at_start)
+    now = datetime.now(start.tzinfo)
+    end = parse_timestamp(created_at_end) if created_at_end else now
+    buckets = day_buckets(start, end)
+    settled = now - timedelta(seconds=REPORT_SETTLE_SECONDS)
+    closed = [bucket for bucket in buckets if bucket[1] <= settled]
+    if not closed:
+        return await client.get(path, live)
+
+    keys = {bucket: report_cache.key(path, params, *bucket) for bucket in closed}
+    cached = await asyncio.to_thread(report_cache.get_many, list(keys.values()))
+    missing = [bucket for bucket in closed if keys[bucket] not in cached]
+    if len(missing) > REPORT_MAX_BUCKET_FETCHES:
+        return await client.get(path, live)
+    # Open buckets are always the tail of the range; fetch them as one window.
+    open_window = [(closed[-1][1], end)] if len(closed) < len(buckets) else []
+
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def fetch(lo: datetime, hi: datetime) -> dict | list:
+        bucket = {**params, "created_at_start": created_at_start}
+        if lo != start:
+            bucket["created_at_start"] = lo.isoformat(timespec="seconds")
+        if hi != end:
+            bucket["created_at_end"] = (hi - timedelta(seconds=1)).isoformat(timespec="seconds")
+        elif created_at_end is not None:
+            bucket["created_at_end"] = created_at_end
+        async with semaphore:
+            return await client.get(path, bucket)
+
+    fetched = await asyncio.gather(*(fetch(lo, hi) for lo, hi in missing + open_window))
+    new = dict(zip(missing, fetched))
+    if new:
+        try:
+            await asyncio.to_thread(report_cache.put_many, {keys[bucket]: value for bucket, value in new.items()})
+        except Exception as exc:
+            log.warning("Report cache: storing %d buckets failed: %s", len(new), exc)
+    parts = [cached[keys[bucket]] if bucket not in new else new[bucket] for bucket in closed]
+    if open_window:
+        parts.append(fetched[-1])
+    try:
+        return merge_reports(parts)
+    except NotMergeable as exc:
+        log.info("Report %s: %s; fetching the range unsplit", path, exc)
+        return await client.get(path, live)
+
+
 @mcp.tool()
+@projectable
 async def get_report_tag_value(
     tag_name: str,
     tag_value: str,
@@ -487,14 +1440,11 @@ async def get_report_tag_value(
         created_at_end: ISO-8601 end date
     """
     params: dict = {"tag_name": tag_name, "tag_value": tag_value}
-    if created_at_start is not None:
-        params["created_at_start"] = created_at_start
-    if created_at_end is not None:
-        params["created_at_end"] = created_at_end
-    return await client.get("/reports/tag_value.json", params)
+    return await _report("/reports/tag_value.json", params, created_at_start, created_at_end)
 
 
 @mcp.tool()
+@projectable
 async def get_report_tag_value_name(
     tag_name: str,
     created_at_start: str | None = None,
@@ -508,11 +1458,72 @@ async def get_report_tag_value_name(
         created_at_end: ISO-8601 end date
     """
     params: dict = {"tag_name": tag_name}
-    if created_at_start is not None:
-        params["created_at_start"] = created_at_start
-    if created_at_end is not None:
-        params["created_at_end"] = created_at_end
-    return await client.get("/reports/tag_value_name.json", params)
+    return await _report("/reports/tag_value_name.json", params, created_at_start, created_at_end)
+
+
+@mcp.tool()
+async def get_report_tag_values(
+    tag_names: list[str],
+    created_at_start: str | None = None,
+    created_at_end: str | None = None,
+    top_n: int = 10,
+    sort_by: str | None = None,
+) -> dict:
+    """Compare several tags (e.g. ["state", "zip", "sub_id"]) over one date range in one call.
+
+    Runs one tag_value_name report per tag concurrently and returns a single
+    table: one row per (tag, value) with the report's numeric metrics, the
+    top_n values of each tag sorted by sort_by (default: the call count).
+    other_values says how many further values each tag had.
+
+    Parameters:
+        tag_names: Tag key names to report on (up to 20).
+        created_at_start: ISO-8601 start date.
+        created_at_end: ISO-8601 end date.
+        top_n: Values kept per tag (default 10).
+        sort_by: Numeric metric to rank values by, descending (default: calls/count).
+    """
+    tag_names = list(dict.fromkeys(tag_names))
+    if not tag_names or len(tag_names) > 20:
+        return {"error": "Provide between 1 and 20 tag names."}
+
+    async def one(tag_name: str) -> dict | list | Exception:
+        try:
+            return await _report("/reports/tag_value_name.json", {"tag_name": tag_name}, created_at_start, created_at_end)
+        except Exception as exc:
+            return exc
+
+    responses = await asyncio.gather(*(one(tag_name) for tag_name in tag_names))
+    reports = {
+        tag_name: report_rows(response)
+        for tag_name, response in zip(tag_names, responses)
+        if not isinstance(response, Exception)
+    }
+    metrics = list(dict.fromkeys(k for rows in reports.values() for row in rows for k in row if k != "value"))
+    if sort_by is not None and reports and sort_by not in metrics:
+        return {"error": f"sort_by must be one of the numeric metrics returned: {', '.join(metrics) or '(none)'}"}
+    table: list[dict] = []
+    other_values: dict[str, int] = {}
+    errors: dict[str, str] = {}
+    for tag_name, response in zip(tag_names, responses):
+        if isinstance(response, Exception):
+            errors[tag_name] = str(response)
+            continue
+        rows = reports[tag_name]
+        key = sort_by or sort_field(rows)
+        if key is not None:
+            rows.sort(key=lambda row: row.get(key) if row.get(key) is not None else float("-inf"), reverse=True)
+        if len(rows) > top_n:
+            other_values[tag_name] = len(rows) - top_n
+        table.extend({"tag": tag_name, **row} for row in rows[:top_n])
+
+    columns = ["tag", "value", *dict.fromkeys(k for row in table for k in row if k not in ("tag", "value"))]
+    result: dict = {"columns": columns, "rows": [[row.get(column) for column in columns] for row in table]}
+    if other_values:
+        result["other_values"] = other_values
+    if errors:
+        result["errors"] = errors
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -520,6 +1531,19 @@ async def get_report_tag_value_name(
 # ---------------------------------------------------------------------------
 
 
+async def _serve() -> None:
+    """Run the SSE server with the entity index and calls warehouse syncing alongside it."""
+    await entity_index.start()
+    if warehouse is not None:
+        await warehouse.start(WAREHOUSE_INTERVAL)
+    try:
+        await mcp.run_sse_async()
+    finally:
+        if warehouse is not None:
+            await warehouse.stop()
+        await entity_index.stop()
+
+
 def main() -> None:
     from .process import handle_command, remove_pid, write_pid
 
@@ -542,7 +1566,7 @@ def main() -> None:
 
     mcp.settings.host = args.host
     mcp.settings.port = args.port
-    mcp.run(transport="sse")
+    asyncio.run(_serve())
 
 
 if __name__ == "__main__":
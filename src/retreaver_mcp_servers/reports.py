@@ -0,0 +1,202 @@
+"""Day-bucketed report fetching with a persistent cache of closed buckets.
+
+A report over ``created_at_start``..``created_at_end`` is split at midnight
+(in the timezone of ``created_at_start``) into buckets. Buckets that ended
+more than a settle delay ago cannot change any more, so their responses are
+kept in SQLite and never fetched again; only the still-open bucket is
+fetched live. The per-bucket responses are merged into one.
+
+The report response format is not documented, so merging is conservative:
+only metrics in ``ADDITIVE_FIELDS`` are summed, rows are matched by their
+label field, and any other field must be identical in every bucket. A
+response with anything else (rates, unique counts, ids, pagination) raises
+:class:`NotMergeable`, and the caller fetches the whole range unsplit
+instead. The same structural reading turns a response into labelled rows
+for the multi-tag report tool.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from .sqlite_store import SQLiteStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_buckets (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# Row fields that label a report row rather than measure it.
+_LABEL_FIELDS = ("tag_value", "value", "name", "key", "tag_name", "label", "id")
+# Metrics that add up across disjoint time ranges.
+ADDITIVE_FIELDS = frozenset({
+    "calls", "total_calls", "call_count", "count",
+    "connected", "connected_calls", "answered", "converted", "converted_calls", "conversions",
+    "revenue", "payout", "profit", "cost",
+    "duration", "total_duration", "dialed_call_duration", "billable_duration",
+})
+# Count fields, in order of preference, used to rank report rows.
+_WEIGHT_FIELDS = ("calls", "total_calls", "count", "call_count")
+
+
+class NotMergeable(ValueError):
+    """Per-bucket report responses that cannot be combined into one."""
+
+
+def day_buckets(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Split ``[start, end)`` at each midnight in ``start``'s timezone."""
+    buckets = []
+    lo = start
+    while lo < end:
+        midnight = datetime.combine(lo.date() + timedelta(days=1), datetime.min.time(), tzinfo=lo.tzinfo)
+        hi = min(midnight, end)
+        buckets.append((lo, hi))
+        lo = hi
+    return buckets
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _label(row: dict) -> Any:
+    for field in _LABEL_FIELDS:
+        if field in row and not isinstance(row[field], (dict, list)):
+            return (field, row[field])
+    return None
+
+
+def _merge_dicts(parts: list[dict]) -> dict:
+    merged: dict = {}
+    for key in dict.fromkeys(k for part in parts for k in part):
+        values = [part[key] for part in parts if key in part]
+        if len(values) == 1:
+            merged[key] = values[0]
+        elif all(_is_number(v) for v in values) and key in ADDITIVE_FIELDS:
+            merged[key] = round(sum(values), 6)
+        elif all(isinstance(v, dict) for v in values):
+            merged[key] = _merge_dicts(values)
+        elif all(isinstance(v, list) for v in values):
+            merged[key] = _merge_lists(values)
+        elif all(v == values[0] for v in values) and (not _is_number(values[0]) or key in _LABEL_FIELDS):
+            merged[key] = values[0]
+        else:
+            raise NotMergeable(f"field {key!r} cannot be combined across buckets")
+    return merged
+
+
+def _merge_lists(parts: list[list]) -> list:
+    rows = [row for part in parts for row in part]
+    if not all(isinstance(row, dict) and _label(row) is not None for row in rows):
+        # Plain values (e.g. column names) are fine as long as every bucket agrees.
+        plain = not any(isinstance(row, (dict, list)) or _is_number(row) for row in rows)
+        if plain and all(part == parts[0] for part in parts):
+            return parts[0]
+        raise NotMergeable("unlabelled rows cannot be combined across buckets")
+    groups: dict[Any, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(_label(row), []).append(row)
+    return [_merge_dicts(group) for group in groups.values()]
+
+
+def merge_reports(parts: list[Any]) -> Any:
+    """Combine per-bucket report responses into one covering all buckets.
+
+    Raises NotMergeable when a field's combined value cannot be derived from
+    the buckets' values.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    if all(isinstance(part, dict) for part in parts):
+        return _merge_dicts(parts)
+    if all(isinstance(part, list) for part in parts):
+        return _merge_lists(parts)
+    raise NotMergeable("bucket responses have different shapes")
+
+
+class ReportCache(SQLiteStore):
+    """SQLite store of closed report buckets. Blocking; call through ``asyncio.to_thread``.
+
+    ``scope`` (the company id) is part of every key, so accounts sharing a
+    cache file never see each other's reports.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(self, path: str | Path, scope: str) -> None:
+        super().__init__(path)
+        self.scope = scope
+
+    def key(self, path: str, params: dict, start: datetime, end: datetime) -> str:
+        return json.dumps([
+            self.scope, path, sorted((k, str(v)) for k, v in params.items()), start.isoformat(), end.isoformat(),
+        ])
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        with closing(self._connect()) as conn:
+            found = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                found.update(
+                    (key, json.loads(data))
+                    for key, data in conn.execute(
+                        f"SELECT key, data FROM report_buckets WHERE key IN ({placeholders})", chunk
+                    )
+                )
+        return found
+
+    def put_many(self, entries: dict[str, Any]) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO report_buckets (key, data, fetched_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(value, separators=(",", ":"), default=str), now) for key, value in entries.items()],
+            )
+
+
+def report_rows(response: Any) -> list[dict]:
+    """Pull ``{"value": label, <numeric metrics>}`` rows out of a report response.
+
+    Accepts a list of row dicts, a dict holding such a list, a dict mapping
+    each value to its metrics, or a dict mapping each value to a count.
+    """
+    rows: list = []
+    if isinstance(response, list):
+        rows = response
+    elif isinstance(response, dict):
+        lists = [v for v in response.values() if isinstance(v, list) and v and all(isinstance(r, dict) for r in v)]
+        if lists:
+            rows = lists[0]
+        elif response and all(isinstance(v, dict) for v in response.values()):
+            rows = [{"value": label, **metrics} for label, metrics in response.items()]
+        elif response and all(_is_number(v) for v in response.values()):
+            rows = [{"value": label, "count": count} for label, count in response.items()]
+    out = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        if len(row) == 1 and isinstance(next(iter(row.values())), dict):
+            row = next(iter(row.values()))  # {"report_row": {...}} style wrapper
+        label = row.get("value") if "value" in row else (_label(row) or (None, None))[1]
+        out.append({"value": label, **{k: v for k, v in row.items() if _is_number(v) and k != "value"}})
+    return out
+
+
+def sort_field(rows: list[dict]) -> str | None:
+    """The metric to rank rows by: a call count if present, else the first numeric field."""
+    fields = list(dict.fromkeys(k for row in rows for k in row if k != "value"))
+    for field in (*_WEIGHT_FIELDS, "count"):
+        if field in fields:
+            return field
+    return fields[0] if fields else None
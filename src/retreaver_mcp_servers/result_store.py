@@ -0,0 +1,146 @@
+"""Server-side storage for oversized tool results, addressed by short handles.
+
+Instead of returning megabytes of rows into the model's context, a tool can
+return a preview plus a handle; the model then pages through or filters the
+stored rows with the fetch_result / query_result tools.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+# query_result comparison operators: {"revenue": {">": 5}}.
+_OPERATORS = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    "in": lambda a, b: a in b,
+    "contains": lambda a, b: a is not None and str(b).lower() in str(a).lower(),
+}
+
+
+@dataclass
+class StoredResult:
+    rows: list
+    meta: dict
+    expires_at: float
+
+
+def _unwrap(row: Any) -> Any:
+    """Look through a single-key resource wrapper such as {"call": {...}}."""
+    if isinstance(row, dict) and len(row) == 1:
+        inner = next(iter(row.values()))
+        if isinstance(inner, dict):
+            return inner
+    return row
+
+
+def _lookup(row: Any, path: str) -> Any:
+    value = _unwrap(row)
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _matches(row: Any, conditions: dict[str, Any]) -> bool:
+    for path, condition in conditions.items():
+        value = _lookup(row, path)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unknown operator {op!r}; use one of: {', '.join(_OPERATORS)}")
+                try:
+                    if not _OPERATORS[op](value, operand):
+                        return False
+                except TypeError:
+                    return False
+        elif isinstance(condition, list):
+            if value not in condition:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class ResultStore:
+    """LRU- and TTL-bounded map of handle → stored rows."""
+
+    def __init__(self, max_entries: int = 32, ttl: float = 1800.0, max_chars: int = 40000, preview_rows: int = 20) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_chars = max_chars
+        self.preview_rows = preview_rows
+        self._entries: OrderedDict[str, StoredResult] = OrderedDict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for handle in [h for h, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[handle]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, rows: list, meta: dict | None = None) -> str:
+        handle = "res_" + secrets.token_hex(6)
+        self._entries[handle] = StoredResult(rows, meta or {}, time.monotonic() + self.ttl)
+        self._evict()
+        return handle
+
+    def get(self, handle: str) -> StoredResult | None:
+        self._evict()
+        entry = self._entries.get(handle)
+        if entry is not None:
+            self._entries.move_to_end(handle)
+        return entry
+
+    def offload(self, result: dict, rows_key: str) -> dict:
+        """Return ``result`` unchanged if it is small, else a preview of ``result[rows_key]`` plus a handle."""
+        rows = result.get(rows_key)
+        if not isinstance(rows, list) or len(rows) <= self.preview_rows:
+            return result
+        if len(json.dumps(result, separators=(",", ":"), default=str)) <= self.max_chars:
+            return result
+        meta = {key: value for key, value in result.items() if key != rows_key}
+        handle = self.put(rows, meta)
+        fields = sorted({key for row in rows[:200] if isinstance(_unwrap(row), dict) for key in _unwrap(row)})
+        return {
+            **meta,
+            "handle": handle,
+            "rows_total": len(rows),
+            "fields": fields,
+            rows_key: rows[:self.preview_rows],
+            "note": (
+                f"Showing the first {self.preview_rows} of {len(rows)} rows. Use fetch_result"
+                f'("{handle}", offset, limit) for more or query_result("{handle}", filter) to filter.'
+            ),
+        }
+
+    def offloading(self, rows_key: str) -> Callable:
+        """Decorator form of :meth:`offload` for a tool; apply it above ``@projectable``."""
+
+        def decorate(fn: Callable[..., Awaitable[dict]]) -> Callable[..., Awaitable[dict]]:
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> dict:
+                return self.offload(await fn(*args, **kwargs), rows_key)
+
+            return wrapper
+
+        return decorate
+
+    @staticmethod
+    def query(rows: list, conditions: dict[str, Any] | None) -> list:
+        """Rows matching every condition: a value (equality), a list (any of) or ``{op: operand}``."""
+        if not conditions:
+            return rows
+        return [row for row in rows if _matches(row, conditions)]
@@ -0,0 +1,43 @@
+"""Coalesce identical concurrent async calls into a single execution."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its result.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is still running await the same task. A waiter being cancelled
+    does not cancel the shared task for everyone else.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.counters: dict[str, int] = {"leaders": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._forget, key))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["shared"] += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # mark retrieved even if every waiter was cancelled
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"in_flight": len(self._inflight), **self.counters}
@@ -0,0 +1,79 @@
+"""On-disk SQLite snapshot of account entities for warm read-server restarts."""
+
+from __future__ import annotations
+
+import json
+from contextlib import closing
+
+from .sqlite_store import SQLiteStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    max_updated_at TEXT,
+    record_count INTEGER NOT NULL
+);
+"""
+
+
+class EntitySnapshot(SQLiteStore):
+    """Persists each entity kind as one row per record, keyed by the record's identity.
+
+    All methods are blocking; call them through ``asyncio.to_thread``.
+    """
+
+    schema = _SCHEMA
+
+    def load(self, kind: str) -> tuple[list[dict], float] | None:
+        """Return ``(records, synced_at)`` for ``kind``, or None if it was never synced."""
+        with closing(self._connect()) as conn:
+            state = conn.execute("SELECT synced_at FROM sync_state WHERE kind = ?", (kind,)).fetchone()
+            if state is None:
+                return None
+            rows = conn.execute("SELECT data FROM entities WHERE kind = ?", (kind,)).fetchall()
+        return [json.loads(data) for (data,) in rows], state[0]
+
+    def sync(self, kind: str, records: dict[str, dict], synced_at: float) -> dict[str, int]:
+        """Bring the stored rows for ``kind`` in line with ``records`` (identity → record).
+
+        Only rows whose ``updated_at`` (or, lacking one, whose content) changed
+        are rewritten, and rows no longer present are deleted.
+        """
+        with closing(self._connect()) as conn, conn:
+            stored = {
+                key: (updated_at, data)
+                for key, updated_at, data in conn.execute(
+                    "SELECT key, updated_at, data FROM entities WHERE kind = ?", (kind,)
+                )
+            }
+            changed = []
+            for key, record in records.items():
+                updated_at = record.get("updated_at")
+                previous = stored.get(key)
+                if previous is not None and updated_at is not None and previous[0] == updated_at:
+                    continue
+                data = json.dumps(record, separators=(",", ":"), default=str)
+                if previous is not None and updated_at is None and previous[1] == data:
+                    continue
+                changed.append((kind, key, updated_at, data))
+            removed = [(kind, key) for key in stored.keys() - records.keys()]
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO entities (kind, key, updated_at, data) VALUES (?, ?, ?, ?)", changed
+            )
+            conn.executemany("DELETE FROM entities WHERE kind = ? AND key = ?", removed)
+            max_updated_at = max((r.get("updated_at") or "" for r in records.values()), default="") or None
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (kind, synced_at, max_updated_at, record_count)"
+                " VALUES (?, ?, ?, ?)",
+                (kind, synced_at, max_updated_at, len(records)),
+            )
+        return {"written": len(changed), "deleted": len(removed), "total": len(records)}
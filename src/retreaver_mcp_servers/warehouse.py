@@ -0,0 +1,291 @@
+"""Local SQLite warehouse of calls, ingested incrementally from /api/v3/calls.json.
+
+The calls endpoint always returns ``sort_by=updated_at`` results newest
+first, so each ingestion run pages downward from the most recently updated
+call until it reaches calls already seen (the watermark). Progress is
+checkpointed after every page, so an interrupted run resumes where it left
+off. Calls moving to the top of the list mid-run can only cause duplicate
+rows on later pages, which the upsert absorbs.
+
+The first run only backfills calls created since a fixed floor, which is
+stored and reported as the start of the warehouse's coverage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from .sqlite_store import SQLiteStore
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    uuid TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    cid TEXT,
+    tid TEXT,
+    afid TEXT,
+    sub_id TEXT,
+    campaign_name TEXT,
+    target_name TEXT,
+    affiliate_name TEXT,
+    caller TEXT,
+    status TEXT,
+    connected INTEGER,
+    converted INTEGER,
+    revenue REAL,
+    payout REAL,
+    total_duration REAL,
+    dialed_call_duration REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_created_at ON calls (created_at);
+CREATE INDEX IF NOT EXISTS calls_cid ON calls (cid, created_at);
+CREATE INDEX IF NOT EXISTS calls_tid ON calls (tid, created_at);
+CREATE INDEX IF NOT EXISTS calls_afid ON calls (afid, created_at);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_COLUMNS = (
+    "uuid", "created_at", "updated_at", "cid", "tid", "afid", "sub_id", "campaign_name",
+    "target_name", "affiliate_name", "caller", "status", "connected", "converted",
+    "revenue", "payout", "total_duration", "dialed_call_duration", "data",
+)
+# Flattened call fields, i.e. every column except the raw JSON.
+ROW_FIELDS = _COLUMNS[:-1]
+
+PageFetcher = Callable[[dict], Awaitable[dict | list]]
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp (``Z`` or offset suffix, or none = UTC) to an aware datetime."""
+    text = value.strip().replace("Z", "+00:00").replace(" ", "T", 1)
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def to_utc_iso(value: str | None) -> str | None:
+    """Normalize a timestamp to sortable UTC text (``YYYY-MM-DDTHH:MM:SS.ffffff``)."""
+    if not value:
+        return None
+    return parse_timestamp(value).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _number(value: object) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _flag(value: object) -> int | None:
+    return None if value is None else int(bool(value))
+
+
+def call_fields(call: dict) -> tuple:
+    """Flatten an API call record into the ``ROW_FIELDS`` values (no raw JSON)."""
+    from .call_flow import connected  # call_flow imports this module
+
+    return (
+        call["uuid"],
+        to_utc_iso(call.get("created_at")) or "",
+        to_utc_iso(call.get("updated_at")),
+        call.get("cid"),
+        call.get("tid"),
+        call.get("afid"),
+        call.get("sid") or call.get("sub_id"),
+        call.get("campaign_name"),
+        call.get("target_name"),
+        call.get("affiliate_name"),
+        call.get("caller"),
+        call.get("status"),
+        int(connected(call)),
+        _flag(call.get("converted")),
+        _number(call.get("revenue")),
+        _number(call.get("payout")),
+        _number(call.get("total_duration")),
+        _number(call.get("dialed_call_duration")),
+    )
+
+
+def call_row(call: dict) -> tuple:
+    """Flatten an API call record into a ``calls`` table row."""
+    return (*call_fields(call), json.dumps(call, separators=(",", ":"), default=str))
+
+
+class CallWarehouse(SQLiteStore):
+    """SQLite-backed call store with resumable incremental ingestion.
+
+    Blocking database work runs in worker threads; the public coroutine
+    methods are safe to call from the event loop.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(
+        self,
+        path: str | Path,
+        fetch_page: PageFetcher,
+        backfill_days: float = 30.0,
+        per_page: int = 100,
+    ) -> None:
+        super().__init__(path)
+        self._fetch_page = fetch_page
+        self.backfill_days = backfill_days
+        self.per_page = per_page
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    # -- storage -----------------------------------------------------------
+
+    def _state(self) -> dict[str, str]:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT key, value FROM ingest_state"))
+
+    def _save_page(self, rows: list[tuple], state: dict[str, str | None]) -> None:
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO calls ({', '.join(_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            for key, value in state.items():
+                if value is None:
+                    conn.execute("DELETE FROM ingest_state WHERE key = ?", (key,))
+                else:
+                    conn.execute("INSERT OR REPLACE INTO ingest_state (key, value) VALUES (?, ?)", (key, value))
+
+    # -- ingestion ---------------------------------------------------------
+
+    async def ingest(self) -> int:
+        """Run (or resume) one ingestion pass. Returns the number of call rows written."""
+        async with self._lock:
+            state = await asyncio.to_thread(self._state)
+            watermark = state.get("watermark")
+            page = int(state.get("run_page", "0")) + 1
+            run_top = state.get("run_top")
+            floor = state.get("floor")
+            params: dict = {"sort_by": "updated_at", "order": "desc", "per_page": self.per_page}
+            if watermark is None:
+                # First run: bound the backfill instead of downloading all history.
+                # The floor is saved with the first page so a resumed run keeps
+                # the same filter (and so the same page offsets).
+                if floor is None:
+                    since = datetime.now(timezone.utc) - timedelta(days=self.backfill_days)
+                    floor = since.isoformat(timespec="seconds")
+                params["created_at_start"] = floor
+
+            written = 0
+            while True:
+                result = await self._fetch_page({**params, "page": page})
+                if isinstance(result, dict) and "data" in result:
+                    items, has_next = result["data"], "next" in result.get("pagination", {})
+                elif isinstance(result, list):
+                    items, has_next = result, False
+                else:
+                    items, has_next = [], False
+                calls = [item.get("call", item) for item in items if isinstance(item, dict)]
+                rows = [call_row(call) for call in calls if call.get("uuid")]
+                updated = [row[2] for row in rows if row[2]]
+                if updated and (run_top is None or max(updated) > run_top):
+                    run_top = max(updated)
+                reached_floor = watermark is not None and bool(updated) and min(updated) <= watermark
+                done = reached_floor or not has_next or not rows
+                await asyncio.to_thread(self._save_page, rows, {
+                    "floor": floor,
+                    "run_page": None if done else str(page),
+                    "run_top": None if done else run_top,
+                    "watermark": run_top if done and run_top else watermark,
+                    "last_run_at": datetime.now(timezone.utc).isoformat(timespec="seconds") if done else None,
+                })
+                written += len(rows)
+                if done:
+                    break
+                page += 1
+            log.info("Call warehouse: ingested %d calls (watermark %s)", written, run_top or watermark)
+            return written
+
+    async def run(self, interval: float) -> None:
+        """Ingest forever, every ``interval`` seconds."""
+        while True:
+            try:
+                await self.ingest()
+            except Exception as exc:
+                log.warning("Call warehouse: ingestion failed: %s", exc)
+            await asyncio.sleep(interval)
+
+    async def start(self, interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # -- queries -----------------------------------------------------------
+
+    def _status(self) -> dict:
+        with closing(self._connect()) as conn:
+            count, newest = conn.execute("SELECT count(*), max(created_at) FROM calls").fetchone()
+            state = dict(conn.execute("SELECT key, value FROM ingest_state"))
+        return {
+            "calls": count,
+            # Every call created at or after this was ingested. Older rows can
+            # exist (old calls updated since) but are not a complete set.
+            "covers_from": to_utc_iso(state.get("floor")),
+            "newest_created_at": newest,
+            "watermark_updated_at": state.get("watermark"),
+            "last_run_at": state.get("last_run_at"),
+            "run_in_progress": "run_page" in state,
+        }
+
+    async def status(self) -> dict:
+        return await asyncio.to_thread(self._status)
+
+    @staticmethod
+    def _where(filters: dict[str, object]) -> tuple[str, list]:
+        clauses, args = [], []
+        if filters.get("created_at_start"):
+            clauses.append("created_at >= ?")
+            args.append(to_utc_iso(str(filters["created_at_start"])))
+        if filters.get("created_at_end"):
+            clauses.append("created_at < ?")
+            args.append(to_utc_iso(str(filters["created_at_end"])))
+        for key in ("cid", "tid", "afid", "sub_id", "status", "caller"):
+            if filters.get(key) is not None:
+                clauses.append(f"{key} = ?")
+                args.append(filters[key])
+        for key in ("connected", "converted"):
+            if filters.get(key) is not None:
+                clauses.append(f"{key} = ?")
+                args.append(int(bool(filters[key])))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def _rows(self, filters: dict[str, object]) -> list[dict]:
+        where, args = self._where(filters)
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(f"SELECT {', '.join(ROW_FIELDS)} FROM calls{where}", args)
+            return [dict(zip(ROW_FIELDS, row)) for row in cursor]
+
+    async def rows(self, filters: dict[str, object]) -> list[dict]:
+        """Return flattened call rows (warehouse columns, no raw JSON) matching ``filters``."""
+        return await asyncio.to_thread(self._rows, filters)
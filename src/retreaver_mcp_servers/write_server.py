@@ -2,13 +2,75 @@
 
 from __future__ import annotations
 
+import hmac
+import logging
+import os
+
+import httpx
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from .client import RetreaverClient
 
+log = logging.getLogger(__name__)
+
 mcp = FastMCP("retreaver-write")
 client = RetreaverClient()
 
+# The read server keeps an in-memory entity index. Changes made here are
+# pushed to it so reads reflect them immediately rather than after its next
+# scheduled refresh. Set to an empty string to disable.
+INDEX_NOTIFY_URL = os.environ.get("RETREAVER_INDEX_NOTIFY_URL", "http://localhost:8001/entity-index")
+# Shared secret the read server requires on patches (RETREAVER_INDEX_TOKEN).
+# It also guards /client-stats here; without one, only loopback is accepted.
+INDEX_TOKEN = os.environ.get("RETREAVER_INDEX_TOKEN", "")
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+
+
+@mcp.custom_route("/client-stats", methods=["GET"])
+async def client_stats(request: Request) -> JSONResponse:
+    """Report the API client's rate limiter, retry, coalescing and cache counters."""
+    if INDEX_TOKEN:
+        allowed = hmac.compare_digest(request.headers.get("x-retreaver-index-token", ""), INDEX_TOKEN)
+    else:
+        allowed = request.client is not None and request.client.host in _LOOPBACK_HOSTS
+    if not allowed:
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+    return JSONResponse(client.stats())
+
+
+async def _notify_index(
+    kind: str,
+    result: object = None,
+    resource_key: str | None = None,
+    fallback: dict | None = None,
+    deleted: dict | None = None,
+) -> None:
+    """Tell the read server's entity index about a successful write.
+
+    ``result`` is the API response; if it does not contain the ``resource_key``
+    record (e.g. an empty 204), ``fallback`` — the submitted fields plus the
+    record's key — is sent instead. Failures are logged and otherwise ignored.
+    """
+    if not INDEX_NOTIFY_URL:
+        return
+    payload: dict = {"kind": kind}
+    if isinstance(result, dict) and isinstance(result.get(resource_key), dict):
+        payload["record"] = result[resource_key]
+    elif fallback:
+        payload["record"] = fallback
+    if deleted:
+        payload["deleted"] = deleted
+    try:
+        async with httpx.AsyncClient(timeout=2.0) as http:
+            headers = {"X-Retreaver-Index-Token": INDEX_TOKEN} if INDEX_TOKEN else None
+            resp = await http.post(INDEX_NOTIFY_URL, json=payload, headers=headers)
+            if resp.status_code >= 400:
+                log.warning("Entity index notification rejected: %d %s", resp.status_code, resp.text)
+    except httpx.HTTPError as exc:
+        log.debug("Entity index notification failed: %s", exc)
+
 
 # ---------------------------------------------------------------------------
 # Targets
@@ -66,7 +128,9 @@ async def create_target(
             body[key] = val
     if business_hours_attributes is not None:
         body["business_hours_attributes"] = business_hours_attributes
-    return await client.post("/targets.json", {"target": body})
+    result = await client.post("/targets.json", {"target": body})
+    await _notify_index("targets", result, "target")
+    return result
 
 
 @mcp.tool()
@@ -122,7 +186,9 @@ async def edit_target(
             body[key] = val
     if business_hours_attributes is not None:
         body["business_hours_attributes"] = business_hours_attributes
-    return await client.put(f"/targets/{target_id}.json", {"target": body})
+    result = await client.put(f"/targets/{target_id}.json", {"target": body})
+    await _notify_index("targets", result, "target", fallback={"id": target_id, **body})
+    return result
 
 
 @mcp.tool()
@@ -132,7 +198,9 @@ async def delete_target(target_id: int) -> dict | str:
     Parameters:
         target_id: Internal target ID to delete.
     """
-    return await client.delete(f"/targets/{target_id}.json")
+    result = await client.delete(f"/targets/{target_id}.json")
+    await _notify_index("targets", deleted={"id": target_id})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -180,7 +248,9 @@ async def create_campaign(
         body["timers_attributes"] = timers_attributes
     if menu_options_attributes is not None:
         body["menu_options_attributes"] = menu_options_attributes
-    return await client.post("/campaigns.json", {"campaign": body})
+    result = await client.post("/campaigns.json", {"campaign": body})
+    await _notify_index("campaigns", result, "campaign")
+    return result
 
 
 @mcp.tool()
@@ -223,7 +293,9 @@ async def edit_campaign(
         body["timers_attributes"] = timers_attributes
     if menu_options_attributes is not None:
         body["menu_options_attributes"] = menu_options_attributes
-    return await client.put(f"/campaigns/cid/{cid}.json", {"campaign": body})
+    result = await client.put(f"/campaigns/cid/{cid}.json", {"campaign": body})
+    await _notify_index("campaigns", result, "campaign", fallback={"cid": cid, **body})
+    return result
 
 
 @mcp.tool()
@@ -233,7 +305,9 @@ async def delete_campaign(cid: str) -> dict | str:
     Parameters:
         cid: Campaign ID to delete.
     """
-    return await client.delete(f"/campaigns/cid/{cid}.json")
+    result = await client.delete(f"/campaigns/cid/{cid}.json")
+    await _notify_index("campaigns", deleted={"cid": cid})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -263,7 +337,9 @@ async def create_publisher(
         body["last_name"] = last_name
     if company_name is not None:
         body["company_name"] = company_name
-    return await client.post("/affiliates.json", {"affiliate": body})
+    result = await client.post("/affiliates.json", {"affiliate": body})
+    await _notify_index("affiliates", result, "affiliate")
+    return result
 
 
 @mcp.tool()
@@ -288,7 +364,9 @@ async def edit_publisher(
         body["last_name"] = last_name
     if company_name is not None:
         body["company_name"] = company_name
-    return await client.put(f"/affiliates/afid/{afid}.json", {"affiliate": body})
+    result = await client.put(f"/affiliates/afid/{afid}.json", {"affiliate": body})
+    await _notify_index("affiliates", result, "affiliate", fallback={"afid": afid, **body})
+    return result
 
 
 @mcp.tool()
@@ -298,7 +376,9 @@ async def delete_publisher(afid: str) -> dict | str:
     Parameters:
         afid: Publisher ID to delete.
     """
-    return await client.delete(f"/affiliates/afid/{afid}.json")
+    result = await client.delete(f"/affiliates/afid/{afid}.json")
+    await _notify_index("affiliates", deleted={"afid": afid})
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -332,7 +412,9 @@ async def create_number(
         body["country"] = country
     if sid is not None:
         body["sid"] = sid
-    return await client.post("/numbers.json", {"number": body})
+    result = await client.post("/numbers.json", {"number": body})
+    await _notify_index("numbers", result, "number")
+    return result
 
 
 @mcp.tool()
@@ -357,7 +439,9 @@ async def edit_number(
         body["cid"] = cid
     if sid is not None:
         body["sid"] = sid
-    return await client.put(f"/numbers/{number_id}.json", {"number": body})
+    result = await client.put(f"/numbers/{number_id}.json", {"number": body})
+    await _notify_index("numbers", result, "number", fallback={"id": number_id, **body})
+    return result
 
 
 @mcp.tool()
@@ -367,7 +451,9 @@ async def delete_number(number_id: int) -> dict | str:
     Parameters:
         number_id: Internal number ID to delete.
     """
-    return await client.delete(f"/numbers/{number_id}.json")
+    result = await client.delete(f"/numbers/{number_id}.json")
+    await _notify_index("numbers", deleted={"id": number_id})
+    return result
 
 
 # ---------------------------------------------------------------------------